@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from collections import Counter
+
+from storage import STATUS_COUNT_VIEWS, build_query
+
+
+class AsyncSupabaseStore:
+    """Read side of SupabaseStore on supabase's AsyncClient."""
+
+    def __init__(self, url, key, options=None):
+        self.url = url
+        self.key = key
+        self.options = options
+        self._client = None
+        self._client_lock = asyncio.Lock()
+
+    async def _table(self, table):
+        if self._client is None:
+            # Creating the client awaits, so the first concurrent queries
+            # would each build one without the lock.
+            async with self._client_lock:
+                if self._client is None:
+                    from supabase import acreate_client
+                    self._client = await acreate_client(self.url, self.key, self.options)
+        return self._client.table(table)
+
+    async def select(self, table, columns="*", filters=(), order=(), offset=0, limit=None):
+        query = build_query((await self._table(table)).select(columns), filters, order)
+        if limit is not None:
+            query = query.range(offset, offset + limit - 1)
+        return (await query.execute()).data
+
+    async def count(self, table, filters=()):
+        query = build_query((await self._table(table)).select("id", count="exact", head=True), filters)
+        return (await query.execute()).count or 0
+
+    async def status_counts(self, table):
+        try:
+            res = await (await self._table(STATUS_COUNT_VIEWS[table])).select("status,total").execute()
+            return {r["status"]: r["total"] for r in res.data}
+        except Exception:
+            # View not created yet: count the status column client-side.
+            return dict(Counter(r["status"] for r in await self.select(table, "status")))
+
+
+class ThreadedAsyncStore:
+    """Async reads for a blocking Store, each run on a worker thread."""
+
+    def __init__(self, store):
+        self.store = store
+
+    async def select(self, table, columns="*", filters=(), order=(), offset=0, limit=None):
+        return await asyncio.to_thread(self.store.select, table, columns, filters, order, offset, limit)
+
+    async def count(self, table, filters=()):
+        return await asyncio.to_thread(self.store.count, table, filters)
+
+    async def status_counts(self, table):
+        return await asyncio.to_thread(self.store.status_counts, table)
+
+
+class ConcurrentReader:
+    """Synchronous facade that runs many reads at once.
+
+    Streamlit scripts are synchronous, so the queries run on one long-lived
+    event loop in a daemon thread (which also keeps the async client's
+    connections open between reruns) and the caller blocks until all of them
+    have finished. Total latency is that of the slowest query rather than the
+    sum of all of them.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name="pm-async-reader", daemon=True).start()
+
+    def gather(self, calls):
+        """Run ``(method, args)`` calls concurrently; failed calls return their exception."""
+        async def run():
+            return await asyncio.gather(*(getattr(self.store, name)(*args) for name, args in calls),
+                                        return_exceptions=True)
+        return asyncio.run_coroutine_threadsafe(run(), self.loop).result()
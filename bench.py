@@ -0,0 +1,237 @@
+"""Benchmark PM_App's data helpers and pages against synthetic data.
+
+Seeds a database with generated projects and tasks, then times the data
+helpers (cold, with the caches emptied, and warm) and a headless render of
+every page through Streamlit's AppTest. Results are written as JSON so runs
+can be compared over time::
+
+    python bench.py --tasks 1000 10000 100000 --out bench.json
+
+The default backend is a fresh SQLite file per size. ``--backend supabase``
+runs against the project in SUPABASE_URL / SUPABASE_KEY, which should be a
+local stand-in (``supabase start``) with the migrations applied: seeding
+inserts into, and ``--reset`` empties, its projects and tasks tables.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "PM_App.py")
+PAGES = ["Dashboard", "Search", "Projects", "My Projects", "Tasks", "My Tasks", "Reports"]
+PROJECT_STATUSES = ["Not Started", "In Progress", "On Hold", "Completed"]
+TASK_STATUSES = ["To Do", "In Progress", "Blocked", "Completed"]
+WORDS = ("design review deploy release audit migrate report invoice customer onboarding backend frontend "
+         "database mobile website launch budget roadmap testing security analytics support training").split()
+
+
+# --- Synthetic data ---
+def zipf_weights(n, skew):
+    """Cumulative weights where item k gets 1 / (k + 1) ** skew."""
+    return list(itertools.accumulate(1 / (k + 1) ** skew for k in range(n)))
+
+
+def generate(projects, tasks, members, skew, seed):
+    """Return (project rows, membership rows, task rows); tasks are generated lazily.
+
+    Tasks are spread over projects and assignees with a Zipf-like skew, so a
+    few projects and people own most of the work, as in real data. Dates fall
+    within 120 days either side of today, so overdue and upcoming queries
+    match some rows.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    names = ["Alice", "Bob", "Charlie", "Dana"] + [f"Member {i}" for i in range(5, members + 1)]
+    names = names[:members]
+
+    def day(spread=120):
+        return (today + timedelta(days=rng.randint(-spread, spread))).isoformat()
+
+    project_rows, member_rows = [], []
+    for i in range(projects):
+        start = day()
+        team = rng.sample(names, min(len(names), rng.randint(1, 5)))
+        project_rows.append({
+            "id": f"PRJ-B{i:06d}",
+            "name": " ".join(rng.sample(WORDS, 2)).title(),
+            "description": " ".join(rng.sample(WORDS, 8)),
+            "start_date": start,
+            "end_date": max(start, day()),
+            "status": rng.choices(PROJECT_STATUSES, weights=(3, 4, 1, 2))[0],
+            "members": ",".join(team),
+            "created_by": "bench@example.com",
+            "created_at": datetime.now().isoformat(),
+        })
+        member_rows += [{"project_id": f"PRJ-B{i:06d}", "member": m} for m in team]
+
+    project_weights, member_weights = zipf_weights(projects, skew), zipf_weights(len(names), skew)
+    task_rows = ({
+        "id": f"TSK-B{i:07d}",
+        "project_id": rng.choices(project_rows, cum_weights=project_weights)[0]["id"],
+        "title": " ".join(rng.sample(WORDS, 4)).capitalize(),
+        "due_date": day(),
+        "assignee": rng.choices(names, cum_weights=member_weights)[0],
+        "status": rng.choices(TASK_STATUSES, weights=(4, 3, 1, 5))[0],
+        "created_at": datetime.now().isoformat(),
+    } for i in range(tasks))
+    return project_rows, member_rows, task_rows
+
+
+def seed(store, data, batch_size=5000):
+    for table, rows in zip(("projects", "project_members", "tasks"), data):
+        rows = iter(rows)
+        while batch := list(itertools.islice(rows, batch_size)):
+            store.insert(table, batch)
+
+
+def reset(store):
+    # Memberships go with their projects (on delete cascade).
+    store.delete("tasks", (("neq", "id", ""),))
+    store.delete("projects", (("neq", "id", ""),))
+
+
+# --- Timing ---
+def timed(fn, repeat, before=None):
+    runs = []
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - start) * 1000)
+    return runs
+
+
+def summary(runs):
+    ordered = sorted(runs)
+    return {
+        "runs_ms": [round(r, 3) for r in runs],
+        "min_ms": round(ordered[0], 3),
+        "median_ms": round(statistics.median(ordered), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def bench_helpers(app, repeat):
+    def cold():
+        app.get_cache().clear()
+        app.reset_snapshot()
+
+    helpers = {
+        "fetch_projects": app.fetch_projects,
+        "fetch_tasks": app.fetch_tasks,
+        "project_metrics": app.project_metrics,
+        "task_metrics": app.task_metrics,
+        "upcoming_deadlines": app.upcoming_deadlines,
+    }
+    results = {}
+    for name, fn in helpers.items():
+        cold_runs = timed(fn, repeat, before=cold)
+        # Warm: the process-wide cache is filled, the per-rerun snapshot is not.
+        warm_runs = timed(fn, repeat, before=app.reset_snapshot)
+        results[name] = {"cold": summary(cold_runs), "warm": summary(warm_runs)}
+    return results
+
+
+def bench_pages(repeat):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    def render(page):
+        at = AppTest.from_file(APP, default_timeout=300)
+        at.session_state["logged_in"] = True
+        at.session_state["user"] = "bench@example.com"
+        at.run()
+        if page != "Dashboard":
+            at.sidebar.radio[0].set_value(page).run()
+        if at.exception:
+            raise RuntimeError(f"{page}: {at.exception[0].value}")
+
+    results = {}
+    for page in PAGES:
+        cold_runs = timed(lambda: render(page), repeat, before=st.cache_resource.clear)
+        warm_runs = timed(lambda: render(page), repeat)
+        results[page] = {"cold": summary(cold_runs), "warm": summary(warm_runs)}
+    return results
+
+
+def run(args, tasks):
+    projects = args.projects or max(10, tasks // 50)
+    data = generate(projects, tasks, args.members, args.skew, args.seed)
+    if args.backend == "sqlite":
+        path = f"{args.db}.{tasks}"
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        os.environ.update(PM_APP_BACKEND="sqlite", PM_APP_DB=path)
+    else:
+        os.environ["PM_APP_BACKEND"] = "supabase"
+
+    # PM_App reads its configuration at import time.
+    sys.modules.pop("PM_App", None)
+    import PM_App as app
+    import streamlit as st
+    st.cache_resource.clear()
+
+    store = app.get_store()
+    if args.reset:
+        reset(store)
+    start = time.perf_counter()
+    seed(store, data)
+    seeded = time.perf_counter() - start
+    print(f"{tasks} tasks / {projects} projects seeded in {seeded:.1f}s", file=sys.stderr)
+
+    return {
+        "tasks": tasks,
+        "projects": projects,
+        "seed_s": round(seeded, 3),
+        "helpers": bench_helpers(app, args.repeat),
+        "pages": {} if args.no_pages else bench_pages(args.repeat),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--backend", choices=("sqlite", "supabase"), default="sqlite")
+    parser.add_argument("--db", default="bench.db", help="SQLite file prefix; one file per size")
+    parser.add_argument("--tasks", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--projects", type=int, help="default: one project per 50 tasks")
+    parser.add_argument("--members", type=int, default=40)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for projects and assignees")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--reset", action="store_true", help="empty projects and tasks before seeding")
+    parser.add_argument("--no-pages", action="store_true", help="skip the AppTest page renders")
+    parser.add_argument("--out", default="bench.json")
+    args = parser.parse_args(argv)
+    if args.backend == "supabase" and len(args.tasks) > 1 and not args.reset:
+        parser.error("--reset is needed to run several sizes against one Supabase database")
+
+    report = {
+        "meta": {
+            "backend": args.backend,
+            "members": args.members,
+            "skew": args.skew,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+        },
+        "runs": [run(args, tasks) for tasks in args.tasks],
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def estimate_size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, tuple):
+        return sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class TableCache:
+    """Process-wide cache of query results shared by every Streamlit session.
+
+    Keys are tuples whose first element is the table name, so a write can drop
+    exactly the entries built from the table it touched. Entries expire after
+    ``ttl`` seconds and the least recently used ones are evicted once the total
+    estimated size goes over ``max_bytes``. Cached values are shared between
+    sessions and must be treated as read-only.
+
+    Each table also has a generation that every change to it bumps. A value
+    read from the database is stored only if the generation is still the one
+    taken before the read, so a load that raced a write cannot put the rows it
+    read before the write back into the cache.
+    """
+
+    def __init__(self, ttl=300, max_bytes=64 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._generations = {}
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                return default
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def put(self, key, value, generation=None):
+        # generation: generation(key[0]) taken before value was read.
+        size = estimate_size(value)
+        with self._lock:
+            if generation is not None and generation != self._generations.get(key[0], 0):
+                return value
+            if key in self._entries:
+                self._drop(key)
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (time.monotonic() + self.ttl, size, value)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+        return value
+
+    def get_or_load(self, key, loader):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            generation = self.generation(key[0])
+            value = self.put(key, loader(), generation)
+        return value
+
+    def generation(self, table):
+        with self._lock:
+            return self._generations.get(table, 0)
+
+    def changed(self, *tables):
+        """Bump the tables' generations, so loads still in flight are not stored."""
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+
+    def keys(self, table):
+        with self._lock:
+            return [k for k in self._entries if k[0] == table]
+
+    def patch(self, key, fn):
+        """Replace an entry with ``fn(value)``, keeping its expiry.
+
+        ``fn`` returning None drops the entry instead. ``fn`` runs outside the
+        lock, so other sessions keep reading meanwhile; if the entry was
+        replaced in the meantime it is dropped rather than overwritten.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return
+        value = fn(entry[2])
+        size = estimate_size(value) if value is not None else 0
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                if key in self._entries:
+                    self._drop(key)
+                return
+            self._drop(key)
+            if value is not None:
+                self._entries[key] = (entry[0], size, value)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    self._drop(next(iter(self._entries)))
+
+    def invalidate(self, *tables):
+        with self._lock:
+            self.changed(*tables)
+            for key in [k for k in self._entries if k[0] in tables]:
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+_MISSING = object()
@@ -0,0 +1,176 @@
+import asyncio
+import fnmatch
+import operator
+import threading
+
+import pandas as pd
+
+from schema import normalize
+
+# A change event is a dict shaped like the "data" part of a Supabase realtime
+# postgres_changes payload:
+#   {"table": "tasks", "type": "UPDATE", "record": {...}, "old_record": {...}}
+# "record" is the new row (absent for DELETE); "old_record" carries at least
+# the id of the row that changed.
+
+_COMPARISONS = {
+    "eq": operator.eq,
+    "neq": operator.ne,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "gt": operator.gt,
+    "gte": operator.ge,
+}
+
+
+class EventBus:
+    """In-process publish/subscribe hub for change events.
+
+    The Supabase feed publishes into it in production; tests and local tools
+    publish events directly.
+    """
+
+    def __init__(self):
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.append(callback)
+        return lambda: self._unsubscribe(callback)
+
+    def _unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback(event)
+
+
+class SupabaseChangeFeed:
+    """Forwards Supabase realtime row changes on ``tables`` to an EventBus.
+
+    Runs its own event loop on a daemon thread. The tables have to be in the
+    supabase_realtime publication (migrations/004_realtime.sql).
+    """
+
+    def __init__(self, url, key, bus, tables=("projects", "tasks")):
+        self.url = url
+        self.key = key
+        self.bus = bus
+        self.tables = tables
+
+    def start(self):
+        threading.Thread(target=asyncio.run, args=(self._listen(),), name="pm-realtime", daemon=True).start()
+        return self
+
+    async def _listen(self):
+        from supabase import acreate_client
+
+        client = await acreate_client(self.url, self.key)
+        channel = client.channel("pm_app_changes")
+        for table in self.tables:
+            channel.on_postgres_changes("*", schema="public", table=table,
+                                        callback=lambda payload: self.bus.publish(payload["data"]))
+        await channel.subscribe()
+        await asyncio.Event().wait()
+
+
+def _matches(record, filters):
+    for op, column, value in filters:
+        field = record.get(column)
+        if op == "in_":
+            if field not in value:
+                return False
+        elif op == "ilike":
+            if field is None or not fnmatch.fnmatchcase(str(field).lower(), value.lower().replace("%", "*")):
+                return False
+        elif field is None or not _COMPARISONS[op](field, value):
+            return False
+    return True
+
+
+def _patch_rows(table, df, columns, filters, events):
+    # Last event per row wins; the frame is filtered, extended and
+    # normalized once for the whole batch.
+    latest = {}
+    for event in events:
+        record = event.get("record") or {}
+        row_id = record.get("id", (event.get("old_record") or {}).get("id"))
+        if row_id is None:
+            return None
+        latest[str(row_id)] = event
+    if not df.empty and "id" not in df.columns:
+        return None
+    if not df.empty:
+        df = df[~df["id"].astype(str).isin(latest)]
+    names = None if columns.strip() == "*" else [c.strip() for c in columns.split(",")]
+    added = [{c: e["record"].get(c) for c in names or e["record"]} for e in latest.values()
+             if e["type"] != "DELETE" and _matches(e["record"], filters)]
+    if added:
+        rows = pd.DataFrame(added)
+        if df.empty:
+            df = rows
+        else:
+            # Categories of the cached frame may not include the new values.
+            df = pd.concat([df.astype({c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)}), rows],
+                           ignore_index=True)
+    return normalize(table, df.reset_index(drop=True))
+
+
+def patch_cache(cache, events):
+    """Apply change events (one event or a list) to the cached query results.
+
+    Row queries (keys ``(table, "rows", columns, filters)``) are patched: the
+    changed rows are removed and, unless deleted, re-added when they still
+    match the filters. Entries that cannot be patched exactly (pages,
+    aggregates) are dropped and reloaded on next use. Each cached entry is
+    rewritten once per table in the batch, however many events it holds, and
+    loads of the table still in flight are not cached.
+    """
+    if isinstance(events, dict):
+        events = [events]
+    by_table = {}
+    for event in events:
+        by_table.setdefault(event["table"], []).append(event)
+    for table, batch in by_table.items():
+        cache.changed(table)
+        for key in cache.keys(table):
+            if key[1] == "rows":
+                cache.patch(key, lambda df, key=key: _patch_rows(table, df, key[2], key[3], batch))
+            else:
+                cache.patch(key, lambda value: None)
+
+
+class EventBatcher:
+    """Subscriber that hands events to ``callback`` in lists.
+
+    The first event of a burst starts a timer; everything that arrives within
+    ``delay`` seconds is delivered with it, so a bulk write that sends one
+    event per row is applied as a few batches rather than row by row.
+    """
+
+    def __init__(self, callback, delay=0.2):
+        self.callback = callback
+        self.delay = delay
+        self._events = []
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            self._events.append(event)
+            if len(self._events) > 1:
+                return
+        timer = threading.Timer(self.delay, self.flush)
+        timer.daemon = True
+        timer.start()
+
+    def flush(self):
+        with self._lock:
+            events, self._events = self._events, []
+        if events:
+            self.callback(events)
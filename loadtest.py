@@ -0,0 +1,239 @@
+"""Load-test one PM_App server with many concurrent simulated users.
+
+Starts ``streamlit run PM_App.py`` on a local SQLite file, seeded with
+synthetic data (see bench.py) when the file does not exist yet. Then, for
+each concurrency level, it connects that many websocket clients, which speak
+Streamlit's browser protocol. Each client goes through login, Dashboard,
+Projects, Tasks and a task status update, repeated ``--iterations`` times.
+For each level it reports:
+
+- throughput (reruns per second)
+- p50/p95/p99 rerun latency, from sending the rerun to the script finishing
+- errors
+- the server's resident memory and how much it grew
+
+Example::
+
+    python loadtest.py --sessions 1 5 10 20 --out loadtest.json
+
+Widget values follow the wire format of the installed Streamlit version:
+radio and selectbox values are sent as their option labels.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from bench import APP, TASK_STATUSES, generate, seed
+from storage import SQLiteStore
+
+LOGIN = ("admin@example.com", "password123")
+WIDGETS = ("text_input", "button", "radio", "selectbox", "checkbox", "number_input", "toggle")
+
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return None
+
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else None
+
+
+class Client:
+    """One browser session: keeps widget values and replays them on every rerun."""
+
+    def __init__(self, url, timeout):
+        self.url = url
+        self.timeout = timeout
+        self.ws = None
+        self.widgets = {}  # key (or label for unkeyed widgets) -> widget id
+        self.fragments = {}  # widget id -> id of the fragment it was drawn in
+        self.values = {}   # widget id -> WidgetState sent on every rerun
+        self.latencies = []
+        self.errors = []
+
+    async def connect(self):
+        self.ws = await websockets.connect(self.url, max_size=None)
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    def set(self, key, **value):
+        widget_id = self.widgets[key]
+        self.values[widget_id] = WidgetState(id=widget_id, **value)
+
+    async def rerun(self, step, trigger=None, changed=None):
+        """Rerun like the browser does after ``changed`` (a widget key) or
+        ``trigger`` (a button) is used: only their fragment when they are in
+        one, otherwise the whole script."""
+        msg = BackMsg()
+        states = list(self.values.values())
+        if trigger is not None:
+            states.append(WidgetState(id=self.widgets[trigger], trigger_value=True))
+        msg.rerun_script.widget_states.widgets.extend(states)
+        fragment = self.fragments.get(self.widgets.get(trigger or changed), "")
+        msg.rerun_script.fragment_id = fragment
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        if not fragment:
+            self.widgets, self.fragments = {}, {}
+        while True:
+            raw = await asyncio.wait_for(self.ws.recv(), self.timeout)
+            fwd = ForwardMsg()
+            fwd.ParseFromString(raw)
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                self._element(step, fwd.delta.new_element, fwd.delta.fragment_id)
+            elif kind == "script_finished" and fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        self.latencies.append((time.perf_counter() - start) * 1000)
+        if not fragment:
+            # Values of widgets that are gone are not sent again.
+            live = set(self.widgets.values())
+            self.values = {i: v for i, v in self.values.items() if i in live}
+
+    def _element(self, step, element, fragment):
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.errors.append(f"{step}: {element.exception.type}: {element.exception.message}")
+        elif kind in WIDGETS:
+            widget = getattr(element, kind)
+            # Keyed widget ids end with the user key; unkeyed ones are found by label.
+            key = widget.id.rsplit("-", 1)[-1]
+            self.widgets[widget.label if key == "None" else key] = widget.id
+            if fragment:
+                self.fragments[widget.id] = fragment
+
+
+async def simulate(client, iterations, task_ids):
+    try:
+        await client.connect()
+        await client.rerun("open")
+        client.set("login_email", string_value=LOGIN[0])
+        client.set("login_password", string_value=LOGIN[1])
+        await client.rerun("login", trigger="Login")
+        await client.rerun("dashboard")
+        for i, task_id in zip(range(iterations), task_ids):
+            for page in ("Dashboard", "Projects", "Tasks"):
+                client.set("Navigation", string_value=page)
+                await client.rerun(page, changed="Navigation")
+            client.set("task_select_query", string_value=task_id)
+            await client.rerun("find task", changed="task_select_query")
+            client.set("task_status_update", string_value=TASK_STATUSES[i % len(TASK_STATUSES)])
+            await client.rerun("update task", trigger="btn_update_task")
+    except Exception as e:
+        client.errors.append(f"{type(e).__name__}: {e}")
+    finally:
+        await client.close()
+
+
+async def run_level(url, sessions, iterations, task_ids, timeout):
+    clients = [Client(url, timeout) for _ in range(sessions)]
+    start = time.perf_counter()
+    await asyncio.gather(*(simulate(c, iterations, task_ids[n * iterations:]) for n, c in enumerate(clients)))
+    return time.perf_counter() - start, clients
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(db, port, log):
+    env = dict(os.environ, PM_APP_BACKEND="sqlite", PM_APP_DB=os.path.abspath(db))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", APP, "--server.headless", "true",
+         "--server.address", "127.0.0.1", "--server.port", str(port), "--server.fileWatcherType", "none",
+         "--browser.gatherUsageStats", "false"],
+        env=env, stdout=log, stderr=subprocess.STDOUT)
+    for _ in range(120):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return server
+        except OSError:
+            if server.poll() is not None:
+                raise RuntimeError("streamlit exited; see the server log")
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("streamlit did not start within 60 seconds")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 20],
+                        help="concurrency levels, run one after the other against the same server")
+    parser.add_argument("--iterations", type=int, default=3, help="page loops per session")
+    parser.add_argument("--db", default="loadtest.db")
+    parser.add_argument("--tasks", type=int, default=10000, help="tasks to seed a new --db with")
+    parser.add_argument("--port", type=int, help="default: a free port")
+    parser.add_argument("--timeout", type=float, default=120, help="seconds allowed per rerun")
+    parser.add_argument("--log", default="loadtest.log", help="server output")
+    parser.add_argument("--out", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    store = SQLiteStore(args.db)
+    if not store.select("tasks", "id", limit=1):
+        seed(store, generate(max(10, args.tasks // 50), args.tasks, 40, 1.1, 42))
+    task_ids = [r["id"] for r in store.select("tasks", "id", order=(("id", False),),
+                                              limit=max(args.sessions) * args.iterations)]
+
+    port = args.port or free_port()
+    results = []
+    with open(args.log, "w") as log:
+        server = start_server(args.db, port, log)
+        try:
+            url = f"ws://127.0.0.1:{port}/_stcore/stream"
+            print(f"{'sessions':>8} {'reruns':>7} {'rps':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+                  f"{'errors':>6} {'rss MB':>8} {'growth':>7}")
+            for sessions in args.sessions:
+                rss_before = rss_mb(server.pid)
+                wall, clients = asyncio.run(run_level(url, sessions, args.iterations, task_ids, args.timeout))
+                rss_after = rss_mb(server.pid)
+                latencies = sorted(l for c in clients for l in c.latencies)
+                errors = [e for c in clients for e in c.errors]
+                r = {
+                    "sessions": sessions,
+                    "reruns": len(latencies),
+                    "wall_s": round(wall, 3),
+                    "throughput_rps": round(len(latencies) / wall, 2),
+                    "p50_ms": round(statistics.median(latencies), 1) if latencies else None,
+                    "p95_ms": round(percentile(latencies, 0.95), 1) if latencies else None,
+                    "p99_ms": round(percentile(latencies, 0.99), 1) if latencies else None,
+                    "errors": len(errors),
+                    "first_errors": errors[:5],
+                    "rss_mb": round(rss_after, 1) if rss_after else None,
+                    "rss_growth_mb": round(rss_after - rss_before, 1) if rss_after and rss_before else None,
+                }
+                results.append(r)
+                print(f"{r['sessions']:>8} {r['reruns']:>7} {r['throughput_rps']:>7} {r['p50_ms']!s:>8} "
+                      f"{r['p95_ms']!s:>8} {r['p99_ms']!s:>8} {r['errors']:>6} {r['rss_mb']!s:>8} "
+                      f"{r['rss_growth_mb']!s:>7}")
+                for error in r["first_errors"]:
+                    print(f"    {error}")
+        finally:
+            server.terminate()
+            server.wait()
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"db": args.db, "iterations": args.iterations, "runs": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
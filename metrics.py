@@ -0,0 +1,227 @@
+"""Per-call instrumentation for the app's data helpers.
+
+``instrument`` wraps a helper and records, for every call, its wall time, the
+rows it returned and their in-memory size, the database round trips made while
+it ran and, for cached helpers, whether it was a cache hit (no round trip at
+all). The size is pandas' memory usage of the result (see
+``cache.estimate_size``), not the bytes received from the database.
+``InstrumentedStore`` wraps a Store and reports each round trip to the call in
+progress. Calls are kept in the process-wide ``RECORDER``, which the sidebar
+Performance panel reads and which can be written out in the Prometheus text
+format, e.g. for node_exporter's textfile collector.
+"""
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+
+from cache import estimate_size
+from storage import Store
+
+# Upper bounds (seconds) of the duration histogram buckets.
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = contextvars.ContextVar("pm_app_call", default=None)
+
+
+def _size(result):
+    """(rows, in-memory bytes) of a helper's return value; pages come as (rows, total)."""
+    if isinstance(result, tuple) and result and isinstance(result[0], (pd.DataFrame, list)):
+        result = result[0]
+    if isinstance(result, (pd.DataFrame, pd.Series, list, dict)):
+        return len(result), estimate_size(result)
+    return 0, 0
+
+
+class Recorder:
+    """Aggregates per function plus the most recent individual calls."""
+
+    def __init__(self, recent=200, window=500):
+        self.window = window
+        self.recent = deque(maxlen=recent)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, call):
+        with self._lock:
+            self.recent.append(call)
+            stat = self._stats.get(call["name"])
+            if stat is None:
+                stat = self._stats[call["name"]] = {
+                    "calls": 0, "errors": 0, "hits": 0, "misses": 0, "seconds": 0.0,
+                    "rows": 0, "memory_bytes": 0, "db_calls": 0, "db_seconds": 0.0,
+                    "buckets": [0] * len(BUCKETS), "durations": deque(maxlen=self.window),
+                }
+            stat["calls"] += 1
+            stat["errors"] += bool(call.get("error"))
+            stat["hits"] += call.get("cache") == "hit"
+            stat["misses"] += call.get("cache") == "miss"
+            for field in ("seconds", "rows", "memory_bytes", "db_calls", "db_seconds"):
+                stat[field] += call.get(field, 0)
+            for i, bound in enumerate(BUCKETS):
+                if call["seconds"] <= bound:
+                    stat["buckets"][i] += 1
+            stat["durations"].append(call["seconds"])
+
+    def clear(self):
+        with self._lock:
+            self.recent.clear()
+            self._stats.clear()
+
+    def last(self, name):
+        with self._lock:
+            return next((c for c in reversed(self.recent) if c["name"] == name), None)
+
+    def summary(self):
+        """One row per function, slowest median first (percentiles over recent calls)."""
+        with self._lock:
+            rows = []
+            for name, s in self._stats.items():
+                durations = pd.Series(s["durations"]) * 1000
+                lookups = s["hits"] + s["misses"]
+                rows.append({
+                    "function": name,
+                    "calls": s["calls"],
+                    "p50_ms": durations.quantile(0.5),
+                    "p95_ms": durations.quantile(0.95),
+                    "max_ms": durations.max(),
+                    "db_calls": s["db_calls"],
+                    "hit_rate": s["hits"] / lookups if lookups else None,
+                    "rows": s["rows"],
+                    "memory_bytes": s["memory_bytes"],
+                    "errors": s["errors"],
+                })
+        return pd.DataFrame(rows).sort_values("p50_ms", ascending=False) if rows else pd.DataFrame()
+
+    def prometheus(self):
+        lines = []
+
+        def family(metric, kind, help_text):
+            lines.extend([f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"])
+
+        with self._lock:
+            stats = sorted(self._stats.items())
+            family("pm_app_call_duration_seconds", "histogram", "Wall time of instrumented calls.")
+            for name, s in stats:
+                for bound, n in zip(BUCKETS, s["buckets"]):
+                    lines.append(f'pm_app_call_duration_seconds_bucket{{function="{name}",le="{bound}"}} {n}')
+                lines.append(f'pm_app_call_duration_seconds_bucket{{function="{name}",le="+Inf"}} {s["calls"]}')
+                lines.append(f'pm_app_call_duration_seconds_sum{{function="{name}"}} {s["seconds"]:.6f}')
+                lines.append(f'pm_app_call_duration_seconds_count{{function="{name}"}} {s["calls"]}')
+            counters = (
+                ("pm_app_call_errors_total", "errors", "Calls that raised."),
+                ("pm_app_cache_hits_total", "hits", "Cached calls served without a database round trip."),
+                ("pm_app_cache_misses_total", "misses", "Cached calls that went to the database."),
+                ("pm_app_rows_total", "rows", "Rows returned."),
+                ("pm_app_memory_bytes_total", "memory_bytes",
+                 "Estimated in-memory size of returned data (not bytes received from the database)."),
+                ("pm_app_db_calls_total", "db_calls", "Database round trips."),
+                ("pm_app_db_seconds_total", "db_seconds", "Time spent in database round trips."),
+            )
+            for metric, field, help_text in counters:
+                family(metric, "counter", help_text)
+                lines.extend(f'{metric}{{function="{name}"}} {s[field]}' for name, s in stats)
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        # Written to a temporary file and renamed, so scrapers never see half a file.
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+
+
+RECORDER = Recorder()
+
+
+def db_call(seconds, calls=1):
+    """Attribute database round trips to the instrumented call in progress."""
+    call = _current.get()
+    if call is not None:
+        call["db_calls"] += calls
+        call["db_seconds"] += seconds
+
+
+def instrument(name=None, cached=False):
+    """Record every call of the decorated function in ``RECORDER``.
+
+    With ``cached`` the call counts as a cache hit when it made no database
+    round trip. Round trips of nested instrumented calls count for the
+    enclosing call too.
+    """
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            call = {"name": label, "started_at": time.time(), "rows": 0, "memory_bytes": 0,
+                    "db_calls": 0, "db_seconds": 0.0}
+            token = _current.set(call)
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+                call["rows"], call["memory_bytes"] = _size(result)
+                return result
+            except Exception as e:
+                call["error"] = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                call["seconds"] = time.perf_counter() - start
+                _current.reset(token)
+                db_call(call["db_seconds"], call["db_calls"])
+                if cached:
+                    call["cache"] = "miss" if call["db_calls"] else "hit"
+                RECORDER.record(call)
+        return wrapper
+    return decorate
+
+
+class InstrumentedStore(Store):
+    """Times every call into ``inner`` as one database round trip."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return getattr(self.inner, method)(*args)
+        finally:
+            db_call(time.perf_counter() - start)
+
+    def select(self, table, columns="*", filters=(), order=(), offset=0, limit=None):
+        return self._timed("select", table, columns, filters, order, offset, limit)
+
+    def page(self, table, columns="*", filters=(), order=(), offset=0, limit=50):
+        return self._timed("page", table, columns, filters, order, offset, limit)
+
+    def count(self, table, filters=()):
+        return self._timed("count", table, filters)
+
+    def status_counts(self, table):
+        return self._timed("status_counts", table)
+
+    def search(self, text, offset=0, limit=20):
+        return self._timed("search", text, offset, limit)
+
+    def insert(self, table, rows):
+        return self._timed("insert", table, rows)
+
+    def add_project(self, project, members):
+        return self._timed("add_project", project, members)
+
+    def upsert(self, table, rows):
+        return self._timed("upsert", table, rows)
+
+    def update(self, table, values, filters):
+        return self._timed("update", table, values, filters)
+
+    def delete(self, table, filters):
+        return self._timed("delete", table, filters)
+
+    def ping(self):
+        return self._timed("ping")
@@ -0,0 +1,14 @@
+-- Status counts grouped in the database, so the Dashboard and Reports read a
+-- handful of rows instead of downloading every project and task to count them.
+
+create or replace view project_status_counts as
+    select status, count(*)::int as total
+    from projects
+    group by status;
+
+create or replace view task_status_counts as
+    select status, count(*)::int as total
+    from tasks
+    group by status;
+
+grant select on project_status_counts, task_status_counts to anon, authenticated;
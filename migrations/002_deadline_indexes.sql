@@ -0,0 +1,10 @@
+-- Indexes behind the Dashboard's date-range queries: overdue tasks
+-- (due_date < today and status <> 'Completed') and upcoming project deadlines
+-- (end_date between today and today + N days).
+
+create index if not exists tasks_due_date_idx on tasks (due_date);
+
+create index if not exists tasks_open_due_date_idx on tasks (due_date)
+    where status <> 'Completed';
+
+create index if not exists projects_end_date_idx on projects (end_date);
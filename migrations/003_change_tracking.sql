@@ -0,0 +1,53 @@
+-- Change tracking for incremental sync (sync.py): every row carries an
+-- updated_at stamped by trigger, and every delete leaves a tombstone in
+-- deleted_rows, so a client can pull only what changed since its watermark.
+-- deleted_rows only ever grows; prune old tombstones once every client has
+-- synced past them.
+
+alter table projects add column if not exists updated_at timestamptz not null default now();
+alter table tasks add column if not exists updated_at timestamptz not null default now();
+
+create index if not exists projects_updated_at_idx on projects (updated_at);
+create index if not exists tasks_updated_at_idx on tasks (updated_at);
+
+create or replace function set_updated_at() returns trigger
+language plpgsql as $$
+begin
+    new.updated_at := now();
+    return new;
+end;
+$$;
+
+create or replace trigger projects_set_updated_at
+    before update on projects
+    for each row execute function set_updated_at();
+
+create or replace trigger tasks_set_updated_at
+    before update on tasks
+    for each row execute function set_updated_at();
+
+create table if not exists deleted_rows (
+    table_name text not null,
+    row_id text not null,
+    deleted_at timestamptz not null default now()
+);
+
+create index if not exists deleted_rows_table_deleted_at_idx on deleted_rows (table_name, deleted_at);
+
+create or replace function record_deleted_row() returns trigger
+language plpgsql as $$
+begin
+    insert into deleted_rows (table_name, row_id) values (tg_table_name, old.id::text);
+    return old;
+end;
+$$;
+
+create or replace trigger projects_record_delete
+    after delete on projects
+    for each row execute function record_deleted_row();
+
+create or replace trigger tasks_record_delete
+    after delete on tasks
+    for each row execute function record_deleted_row();
+
+grant select on deleted_rows to anon, authenticated;
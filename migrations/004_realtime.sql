@@ -0,0 +1,4 @@
+-- Publish row changes on projects and tasks to Supabase Realtime, which the
+-- app subscribes to (changefeed.py) to patch its caches instead of polling.
+
+alter publication supabase_realtime add table projects, tasks;
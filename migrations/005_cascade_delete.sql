@@ -0,0 +1,11 @@
+-- Deleting a project removes its tasks in the same statement, so
+-- delete ... where id in (...) is atomic and takes one round trip for any
+-- number of projects.
+
+alter table tasks drop constraint if exists tasks_project_id_fkey;
+
+alter table tasks
+    add constraint tasks_project_id_fkey
+    foreign key (project_id) references projects (id) on delete cascade;
+
+create index if not exists tasks_project_id_idx on tasks (project_id);
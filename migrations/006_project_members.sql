@@ -0,0 +1,46 @@
+-- Project membership as a junction table instead of the comma-joined
+-- projects.members string, so "which projects is X on" is an index lookup.
+-- projects.members is still written for older clients but no longer read.
+
+create table if not exists project_members (
+    project_id text not null references projects (id) on delete cascade,
+    member text not null,
+    primary key (project_id, member)
+);
+
+create index if not exists project_members_member_idx on project_members (member, project_id);
+
+-- Backfill from the string column (comma-joined names, or a JSON-style list
+-- such as ["Alice", "Bob"] in older rows).
+insert into project_members (project_id, member)
+select p.id, trim(both ' "[]' from m)
+from projects p, unnest(string_to_array(p.members::text, ',')) as m
+where trim(both ' "[]' from m) <> ''
+on conflict do nothing;
+
+grant select, insert, delete on project_members to anon, authenticated;
+
+-- One member's projects as a single filtered query (member = ?), read by the
+-- My Projects view a page at a time; no list of project ids is sent back.
+create or replace view member_projects as
+    select m.member, p.id, p.name, p.description, p.start_date, p.end_date, p.status, p.created_by, p.created_at
+    from project_members m
+    join projects p on p.id = m.project_id;
+
+grant select on member_projects to anon, authenticated;
+
+-- A new project and its memberships in one transaction, called by the app as
+-- rpc('add_project'); projects never end up without their member rows.
+create or replace function add_project(project jsonb, members text[])
+returns void language plpgsql as $$
+begin
+    insert into projects (id, name, description, start_date, end_date, status, members, created_by, created_at)
+    select id, name, description, start_date, end_date, status, members, created_by, created_at
+    from jsonb_populate_record(null::projects, project);
+    insert into project_members (project_id, member)
+    select project ->> 'id', m from unnest(members) as m
+    on conflict do nothing;
+end;
+$$;
+
+grant execute on function add_project(jsonb, text[]) to anon, authenticated;
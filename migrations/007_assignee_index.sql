@@ -0,0 +1,5 @@
+-- Index behind the My Tasks view: one member's tasks (assignee = ?), already
+-- grouped by status and ordered by due date.
+
+create index if not exists tasks_assignee_status_due_date_idx
+    on tasks (assignee, status, due_date);
@@ -0,0 +1,80 @@
+-- Full-text search over project names/descriptions and task titles, called
+-- by the app as rpc('search_items'). Terms match as word prefixes through
+-- tsvector GIN indexes, ranked with names weighted over descriptions; when
+-- nothing matches, pg_trgm word similarity gives typo-tolerant results.
+
+create extension if not exists pg_trgm;
+
+alter table projects add column if not exists search tsvector generated always as (
+    setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'B')) stored;
+alter table tasks add column if not exists search tsvector generated always as (
+    to_tsvector('simple', coalesce(title, ''))) stored;
+
+create index if not exists projects_search_idx on projects using gin (search);
+create index if not exists tasks_search_idx on tasks using gin (search);
+create index if not exists projects_name_trgm_idx on projects using gin (name gin_trgm_ops);
+create index if not exists tasks_title_trgm_idx on tasks using gin (title gin_trgm_ops);
+
+-- Each table returns only its best off + lim hits, and matches are counted
+-- without ranking them, up to 1001 per table (SEARCH_MAX_TOTAL + 1 in
+-- storage.py; larger totals are reported as 1001, shown as "1000+"), so a
+-- page does not rank and materialize every match.
+create or replace function search_items(q text, lim int default 20, off int default 0)
+returns table (kind text, id text, title text, status text, rank real, total bigint)
+language plpgsql stable as $$
+#variable_conflict use_column
+declare
+    terms tsquery;
+    top_n int := off + lim;
+    cap int := 1001;
+    matches bigint;
+begin
+    select to_tsquery('simple', string_agg(quote_literal(w) || ':*', ' & '))
+    into terms
+    from regexp_split_to_table(lower(q), '\W+') as w
+    where w <> '';
+    if terms is null then
+        return;
+    end if;
+
+    select (select count(*) from (select 1 from projects p where p.search @@ terms limit cap) m)
+         + (select count(*) from (select 1 from tasks t where t.search @@ terms limit cap) m)
+    into matches;
+    if matches > 0 then
+        return query
+        with hits as (
+            (select 'project'::text as kind, p.id::text as id, p.name as title, p.status,
+                    ts_rank(p.search, terms) as rank
+             from projects p where p.search @@ terms
+             order by 5 desc limit top_n)
+            union all
+            (select 'task', t.id::text, t.title, t.status, ts_rank(t.search, terms)
+             from tasks t where t.search @@ terms
+             order by 5 desc limit top_n)
+        )
+        select h.*, least(matches, cap) from hits h
+        order by h.rank desc, h.title limit lim offset off;
+        return;
+    end if;
+
+    select (select count(*) from (select 1 from projects p where q <% p.name limit cap) m)
+         + (select count(*) from (select 1 from tasks t where q <% t.title limit cap) m)
+    into matches;
+    return query
+    with hits as (
+        (select 'project'::text as kind, p.id::text as id, p.name as title, p.status,
+                word_similarity(q, p.name) as rank
+         from projects p where q <% p.name
+         order by 5 desc limit top_n)
+        union all
+        (select 'task', t.id::text, t.title, t.status, word_similarity(q, t.title)
+         from tasks t where q <% t.title
+         order by 5 desc limit top_n)
+    )
+    select h.*, least(matches, cap) from hits h
+    order by h.rank desc, h.title limit lim offset off;
+end;
+$$;
+
+grant execute on function search_items(text, int, int) to anon, authenticated;
@@ -0,0 +1,73 @@
+-- Daily rollup of task counts per project, assignee and status behind the
+-- Reports trends (burn-up, throughput, cumulative flow). A trigger adds each
+-- task write to the current day's rows, so the charts read a few rows per
+-- day, however many tasks there are, and no scheduled job is needed.
+--   delta:   net change that day in the number of tasks in the status;
+--            a running sum over days gives the count on any day
+--   entered: tasks that moved into the status that day
+-- Runs as one transaction: a task written between creating the trigger and
+-- the backfill would otherwise make the backfill skip all earlier history.
+
+begin;
+
+create table if not exists task_status_daily (
+    day date not null,
+    project_id text not null default '',
+    assignee text not null default '',
+    status text not null default '',
+    delta integer not null default 0,
+    entered integer not null default 0,
+    primary key (day, project_id, assignee, status)
+);
+
+create index if not exists task_status_daily_project_idx on task_status_daily (project_id, day);
+create index if not exists task_status_daily_assignee_idx on task_status_daily (assignee, day);
+
+create or replace view task_status_by_day as
+select day, status, sum(delta)::int as delta, sum(entered)::int as entered
+from task_status_daily
+group by day, status;
+
+-- security definer: clients may write tasks but only read the rollup.
+create or replace function rollup_task_status() returns trigger
+language plpgsql security definer set search_path = public as $$
+begin
+    if tg_op = 'UPDATE' and (new.project_id, new.assignee, new.status)
+            is not distinct from (old.project_id, old.assignee, old.status) then
+        return null;
+    end if;
+    if tg_op in ('UPDATE', 'DELETE') then
+        insert into task_status_daily as r (day, project_id, assignee, status, delta)
+        values (current_date, coalesce(old.project_id::text, ''), coalesce(old.assignee, ''),
+                coalesce(old.status, ''), -1)
+        on conflict (day, project_id, assignee, status) do update set delta = r.delta - 1;
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        insert into task_status_daily as r (day, project_id, assignee, status, delta, entered)
+        values (current_date, coalesce(new.project_id::text, ''), coalesce(new.assignee, ''),
+                coalesce(new.status, ''), 1,
+                case when tg_op = 'INSERT' or new.status is distinct from old.status then 1 else 0 end)
+        on conflict (day, project_id, assignee, status)
+        do update set delta = r.delta + 1, entered = r.entered + excluded.entered;
+    end if;
+    return null;
+end;
+$$;
+
+create or replace trigger tasks_rollup_status
+    after insert or update or delete on tasks
+    for each row execute function rollup_task_status();
+
+-- Backfill on first run: existing tasks count from the day they were
+-- created, in their current status. Earlier moves between statuses are not
+-- known, so they do not add to entered.
+insert into task_status_daily (day, project_id, assignee, status, delta)
+select coalesce(created_at::date, current_date), coalesce(project_id::text, ''), coalesce(assignee, ''),
+       coalesce(status, ''), count(*)
+from tasks
+where not exists (select 1 from task_status_daily)
+group by 1, 2, 3, 4;
+
+grant select on task_status_daily, task_status_by_day to anon, authenticated;
+
+commit;
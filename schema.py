@@ -0,0 +1,38 @@
+import pandas as pd
+
+# Column types applied once when rows are loaded: dates are parsed a single
+# time instead of on every render, and repeated labels (statuses, assignees,
+# project ids) are stored once per category instead of once per row.
+CATEGORY_COLUMNS = {
+    "projects": ("status",),
+    "member_projects": ("status",),
+    "tasks": ("status", "assignee", "project_id"),
+}
+DATE_COLUMNS = {
+    "projects": ("start_date", "end_date"),
+    "member_projects": ("start_date", "end_date"),
+    "tasks": ("due_date",),
+}
+
+
+def normalize(table, df):
+    """Return ``df`` with the table's date and categorical columns typed."""
+    typed = {}
+    for column in DATE_COLUMNS.get(table, ()):
+        if column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column]):
+            typed[column] = pd.to_datetime(df[column], errors="coerce", format="ISO8601")
+    for column in CATEGORY_COLUMNS.get(table, ()):
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            typed[column] = df[column].astype("category")
+    return df.assign(**typed) if typed else df
+
+
+def to_record(row):
+    """Turn a normalized row back into plain values that can be written."""
+    def plain(value):
+        if isinstance(value, pd.Timestamp):
+            return value.date().isoformat()
+        if pd.api.types.is_scalar(value) and pd.isna(value):
+            return None
+        return value
+    return {column: plain(value) for column, value in row.items()}
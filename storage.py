@@ -0,0 +1,569 @@
+import json
+import queue
+import re
+import sqlite3
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+# Filters are (operator, column, value) triples named after the Supabase query
+# builder methods; order is a sequence of (column, descending) pairs.
+SQL_OPERATORS = {
+    "eq": "=",
+    "neq": "<>",
+    "lt": "<",
+    "lte": "<=",
+    "gt": ">",
+    "gte": ">=",
+    "ilike": "LIKE",
+}
+
+# Rows returned by Store.search
+SEARCH_COLUMNS = ("kind", "id", "title", "status")
+
+# Search totals above this are reported as SEARCH_MAX_TOTAL + 1 ("1000+").
+SEARCH_MAX_TOTAL = 1000
+
+# Error codes of a call to a database function that does not exist yet:
+# PostgREST's "not in the schema cache" and Postgres' undefined_function.
+MISSING_FUNCTION_CODES = ("PGRST202", "42883")
+
+# Views created by migrations/001_status_counts.sql
+STATUS_COUNT_VIEWS = {"projects": "project_status_counts", "tasks": "task_status_counts"}
+
+
+class Store:
+    """Storage interface used by the app. Rows go in and come out as dicts."""
+
+    def select(self, table, columns="*", filters=(), order=(), offset=0, limit=None):
+        raise NotImplementedError
+
+    def page(self, table, columns="*", filters=(), order=(), offset=0, limit=50):
+        """Return ``(rows, total)`` where total counts every matching row."""
+        raise NotImplementedError
+
+    def count(self, table, filters=()):
+        """Return the number of matching rows, counted by the database."""
+        raise NotImplementedError
+
+    def status_counts(self, table):
+        """Return a ``{status: rows}`` dict computed by the database."""
+        raise NotImplementedError
+
+    def insert(self, table, rows):
+        raise NotImplementedError
+
+    def add_project(self, project, members):
+        """Insert a project row and its project_members rows atomically."""
+        raise NotImplementedError
+
+    def upsert(self, table, rows):
+        """Insert rows, replacing any existing row with the same id."""
+        raise NotImplementedError
+
+    def update(self, table, values, filters):
+        raise NotImplementedError
+
+    def delete(self, table, filters):
+        raise NotImplementedError
+
+    def search(self, text, offset=0, limit=20):
+        """Full-text search over project names/descriptions and task titles.
+
+        Returns ``(rows, total)``; rows carry ``kind`` ("project" or "task"),
+        ``id``, ``title`` and ``status``, best match first. A total above
+        ``SEARCH_MAX_TOTAL`` may be reported as ``SEARCH_MAX_TOTAL + 1``.
+        """
+        raise NotImplementedError
+
+    def ping(self):
+        """Run the cheapest possible round trip; return its latency in seconds."""
+        raise NotImplementedError
+
+
+def build_query(query, filters=(), order=()):
+    """Apply filters and order to a Supabase (sync or async) query builder."""
+    for op, column, value in filters:
+        query = getattr(query, op)(column, value)
+    for column, desc in order:
+        query = query.order(column, desc=desc)
+    return query
+
+
+class SupabaseStore(Store):
+    def __init__(self, client):
+        self.client = client
+
+    def _query(self, query, filters=(), order=()):
+        return build_query(query, filters, order)
+
+    def select(self, table, columns="*", filters=(), order=(), offset=0, limit=None):
+        query = self._query(self.client.table(table).select(columns), filters, order)
+        if limit is not None:
+            query = query.range(offset, offset + limit - 1)
+        return query.execute().data
+
+    def page(self, table, columns="*", filters=(), order=(), offset=0, limit=50):
+        query = self._query(self.client.table(table).select(columns, count="exact"), filters, order)
+        res = query.range(offset, offset + limit - 1).execute()
+        return res.data, res.count or 0
+
+    def count(self, table, filters=()):
+        # HEAD request: the total comes back in a header, no rows are sent.
+        return self._query(self.client.table(table).select("id", count="exact", head=True), filters).execute().count or 0
+
+    def status_counts(self, table):
+        try:
+            res = self.client.table(STATUS_COUNT_VIEWS[table]).select("status,total").execute()
+            return {r["status"]: r["total"] for r in res.data}
+        except Exception:
+            # View not created yet: count the status column client-side.
+            return dict(Counter(r["status"] for r in self.select(table, "status")))
+
+    def search(self, text, offset=0, limit=20):
+        try:
+            rows = self.client.rpc("search_items", {"q": text, "lim": limit, "off": offset}).execute().data
+            return [{k: r[k] for k in SEARCH_COLUMNS} for r in rows], (rows[0]["total"] if rows else 0)
+        except Exception as e:
+            if getattr(e, "code", None) not in MISSING_FUNCTION_CODES:
+                raise
+        # Function not created yet (migrations/008_search.sql): substring match
+        # on names and titles, projects first, reading no more than the page.
+        pattern, end = f"%{text}%", offset + limit - 1
+        projects = (self.client.table("projects").select("id,title:name,status", count="exact")
+                    .ilike("name", pattern).order("name").order("id").range(0, end).execute())
+        tasks = (self.client.table("tasks").select("id,title,status", count="exact")
+                 .ilike("title", pattern).order("title").order("id").range(0, end).execute())
+        rows = [{"kind": "project", **r} for r in projects.data] + [{"kind": "task", **r} for r in tasks.data]
+        total = (projects.count or 0) + (tasks.count or 0)
+        return rows[offset:offset + limit], min(total, SEARCH_MAX_TOTAL + 1)
+
+    def insert(self, table, rows):
+        self.client.table(table).insert(rows).execute()
+
+    def add_project(self, project, members):
+        # One transaction in the database (migrations/006_project_members.sql).
+        self.client.rpc("add_project", {"project": project, "members": list(members)}).execute()
+
+    def upsert(self, table, rows):
+        self.client.table(table).upsert(rows).execute()
+
+    def update(self, table, values, filters):
+        self._query(self.client.table(table).update(values), filters).execute()
+
+    def delete(self, table, filters):
+        self._query(self.client.table(table).delete(), filters).execute()
+
+    def ping(self):
+        start = time.perf_counter()
+        self.client.table("projects").select("id").limit(1).execute()
+        return time.perf_counter() - start
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    description TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    status TEXT,
+    members TEXT,
+    created_by TEXT,
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    project_id TEXT,
+    title TEXT,
+    due_date TEXT,
+    assignee TEXT,
+    status TEXT,
+    created_at TEXT,
+    updated_at TEXT,
+    FOREIGN KEY (project_id) REFERENCES projects(id)
+);
+CREATE TABLE IF NOT EXISTS project_members (
+    project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    member TEXT NOT NULL,
+    PRIMARY KEY (project_id, member)
+);
+CREATE INDEX IF NOT EXISTS project_members_member_idx ON project_members (member, project_id);
+CREATE VIEW IF NOT EXISTS member_projects AS
+SELECT m.member, p.id, p.name, p.description, p.start_date, p.end_date, p.status, p.created_by, p.created_at
+FROM project_members m JOIN projects p ON p.id = m.project_id;
+CREATE INDEX IF NOT EXISTS projects_status_idx ON projects (status);
+CREATE INDEX IF NOT EXISTS projects_end_date_idx ON projects (end_date);
+CREATE INDEX IF NOT EXISTS projects_name_nocase_idx ON projects (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS tasks_project_id_idx ON tasks (project_id);
+CREATE INDEX IF NOT EXISTS tasks_status_idx ON tasks (status);
+CREATE INDEX IF NOT EXISTS tasks_title_nocase_idx ON tasks (title COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS tasks_due_date_idx ON tasks (due_date);
+CREATE INDEX IF NOT EXISTS tasks_assignee_status_due_date_idx ON tasks (assignee, status, due_date);
+CREATE INDEX IF NOT EXISTS tasks_open_due_date_idx ON tasks (due_date) WHERE status <> 'Completed';
+"""
+
+# Deleting a project deletes its tasks in the same statement, like ON DELETE
+# CASCADE in migrations/005_cascade_delete.sql (the foreign key in existing
+# pm_app.db files cannot be altered in place).
+SQLITE_CASCADE = """
+CREATE TRIGGER IF NOT EXISTS projects_cascade_delete BEFORE DELETE ON projects
+BEGIN
+    DELETE FROM tasks WHERE project_id = OLD.id;
+END;
+"""
+
+# updated_at is stamped on every insert/update that does not set it itself,
+# and every delete leaves a tombstone, so a mirror can pull only what changed
+# (see sync.py). Same scheme as migrations/003_change_tracking.sql.
+SQLITE_NOW = "strftime('%Y-%m-%dT%H:%M:%f', 'now')"
+
+SQLITE_CHANGE_TRACKING = """
+CREATE TABLE IF NOT EXISTS deleted_rows (
+    table_name TEXT NOT NULL,
+    row_id TEXT NOT NULL,
+    deleted_at TEXT NOT NULL DEFAULT ({now})
+);
+CREATE INDEX IF NOT EXISTS deleted_rows_table_deleted_at_idx ON deleted_rows (table_name, deleted_at);
+""".format(now=SQLITE_NOW) + "".join("""
+CREATE INDEX IF NOT EXISTS {t}_updated_at_idx ON {t} (updated_at);
+CREATE TRIGGER IF NOT EXISTS {t}_stamp_insert AFTER INSERT ON {t}
+WHEN NEW.updated_at IS NULL
+BEGIN
+    UPDATE {t} SET updated_at = {now} WHERE id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS {t}_stamp_update AFTER UPDATE ON {t}
+WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE {t} SET updated_at = {now} WHERE id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS {t}_tombstone AFTER DELETE ON {t}
+BEGIN
+    INSERT INTO deleted_rows (table_name, row_id) VALUES ('{t}', OLD.id);
+END;
+""".format(t=table, now=SQLITE_NOW) for table in ("projects", "tasks"))
+
+# Trigram FTS5 indexes over project names/descriptions and task titles, kept
+# current by triggers. They are external-content tables keyed by rowid, so a
+# change re-indexes one row; run INSERT INTO <t>_fts(<t>_fts) VALUES('rebuild')
+# after a VACUUM, which may renumber rowids. migrations/008_search.sql is the
+# Postgres counterpart.
+SEARCH_FIELDS = {"projects": ("name", "description"), "tasks": ("title",)}
+
+SQLITE_SEARCH = "".join("""
+CREATE VIRTUAL TABLE IF NOT EXISTS {t}_fts USING fts5({cols}, content='{t}', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS {t}_fts_insert AFTER INSERT ON {t}
+BEGIN
+    INSERT INTO {t}_fts (rowid, {cols}) VALUES (NEW.rowid, {new});
+END;
+CREATE TRIGGER IF NOT EXISTS {t}_fts_update AFTER UPDATE OF {cols} ON {t}
+BEGIN
+    INSERT INTO {t}_fts ({t}_fts, rowid, {cols}) VALUES ('delete', OLD.rowid, {old});
+    INSERT INTO {t}_fts (rowid, {cols}) VALUES (NEW.rowid, {new});
+END;
+CREATE TRIGGER IF NOT EXISTS {t}_fts_delete AFTER DELETE ON {t}
+BEGIN
+    INSERT INTO {t}_fts ({t}_fts, rowid, {cols}) VALUES ('delete', OLD.rowid, {old});
+END;
+""".format(t=table, cols=", ".join(fields), new=", ".join(f"NEW.{f}" for f in fields),
+           old=", ".join(f"OLD.{f}" for f in fields)) for table, fields in SEARCH_FIELDS.items())
+
+# Matches rows containing every search term; the column weights favour
+# names over descriptions. Each index ranks its own matches and only its
+# best :n (offset + limit) are joined to their table, so a page costs one
+# ranking pass rather than materializing every match.
+SQLITE_SEARCH_QUERY = """
+SELECT 'project' AS kind, p.id, p.name AS title, p.status, f.score AS rank FROM (
+    SELECT rowid, bm25(projects_fts, 10.0, 1.0) AS score FROM projects_fts
+    WHERE projects_fts MATCH :q ORDER BY score LIMIT :n) f JOIN projects p ON p.rowid = f.rowid
+UNION ALL
+SELECT 'task', t.id, t.title, t.status, f.score FROM (
+    SELECT rowid, bm25(tasks_fts) AS score FROM tasks_fts
+    WHERE tasks_fts MATCH :q ORDER BY score LIMIT :n) f JOIN tasks t ON t.rowid = f.rowid
+"""
+
+# Matches counted without ranking them, and only up to :cap per index.
+SQLITE_SEARCH_COUNT = """
+SELECT (SELECT COUNT(*) FROM (SELECT 1 FROM projects_fts WHERE projects_fts MATCH :q LIMIT :cap))
+     + (SELECT COUNT(*) FROM (SELECT 1 FROM tasks_fts WHERE tasks_fts MATCH :q LIMIT :cap))
+"""
+
+
+# Daily rollup of task counts per project, assignee and status, kept by
+# triggers so the Reports trends read a few rows per day instead of scanning
+# tasks. Each row holds that day's net change in the number of tasks
+# (``delta``; a running sum over days gives the count on any day) and how
+# many tasks moved into the status that day (``entered``). Days are UTC.
+# migrations/009_task_rollup.sql is the Postgres counterpart.
+SQLITE_ROLLUP_ROW = """
+INSERT INTO task_status_daily (day, project_id, assignee, status, delta, entered)
+VALUES (date('now'), coalesce({r}.project_id, ''), coalesce({r}.assignee, ''), coalesce({r}.status, ''), {delta}, {entered})
+ON CONFLICT (day, project_id, assignee, status)
+DO UPDATE SET delta = delta + excluded.delta, entered = entered + excluded.entered;"""
+
+SQLITE_ROLLUP = """
+CREATE TABLE IF NOT EXISTS task_status_daily (
+    day TEXT NOT NULL,
+    project_id TEXT NOT NULL DEFAULT '',
+    assignee TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    delta INTEGER NOT NULL DEFAULT 0,
+    entered INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, project_id, assignee, status)
+);
+CREATE INDEX IF NOT EXISTS task_status_daily_project_idx ON task_status_daily (project_id, day);
+CREATE INDEX IF NOT EXISTS task_status_daily_assignee_idx ON task_status_daily (assignee, day);
+CREATE VIEW IF NOT EXISTS task_status_by_day AS
+SELECT day, status, SUM(delta) AS delta, SUM(entered) AS entered
+FROM task_status_daily GROUP BY day, status;
+CREATE TRIGGER IF NOT EXISTS tasks_rollup_insert AFTER INSERT ON tasks
+BEGIN{insert}
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_rollup_update AFTER UPDATE OF project_id, assignee, status ON tasks
+WHEN NEW.project_id IS NOT OLD.project_id OR NEW.assignee IS NOT OLD.assignee OR NEW.status IS NOT OLD.status
+BEGIN{remove}{update}
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_rollup_delete AFTER DELETE ON tasks
+BEGIN{remove}
+END;
+""".format(insert=SQLITE_ROLLUP_ROW.format(r="NEW", delta=1, entered=1),
+           remove=SQLITE_ROLLUP_ROW.format(r="OLD", delta=-1, entered=0),
+           update=SQLITE_ROLLUP_ROW.format(r="NEW", delta=1, entered="NEW.status IS NOT OLD.status"))
+
+# Existing tasks count from the day they were created, in their current
+# status; moves between statuses are only known from here on, so they do not
+# add to ``entered``.
+SQLITE_ROLLUP_BACKFILL = """
+INSERT INTO task_status_daily (day, project_id, assignee, status, delta)
+SELECT coalesce(substr(created_at, 1, 10), date('now')), coalesce(project_id, ''), coalesce(assignee, ''),
+       coalesce(status, ''), COUNT(*)
+FROM tasks GROUP BY 1, 2, 3, 4
+"""
+
+
+def _fts_terms(text):
+    """Quoted FTS5 strings for the search terms (trigrams need 3+ characters)."""
+    words = [w for w in re.findall(r"\w+", text.lower()) if len(w) >= 3]
+    exact = " AND ".join(f'"{w}"' for w in words)
+    # Typo fallback: every term must share a 4-character run (two consecutive
+    # trigrams; 3 characters for terms of 4 or fewer) with the row, so
+    # "projcet" still finds "project" through "proj" without matching every
+    # row that contains "pro". bm25 ranks rows sharing more first.
+    fuzzy = " AND ".join("(" + " OR ".join(sorted({f'"{w[i:i + n]}"' for i in range(len(w) - n + 1)})) + ")"
+                         for w in words for n in [3 if len(w) <= 4 else 4])
+    return exact, fuzzy
+
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _ident(name):
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid identifier: {name!r}")
+    return f'"{name}"'
+
+
+def _where(filters):
+    clauses, params = [], []
+    for op, column, value in filters:
+        if op == "in_":
+            value = list(value)
+            if not value:
+                clauses.append("0")
+                continue
+            clauses.append(f"{_ident(column)} IN ({','.join('?' * len(value))})")
+            params.extend(value)
+        elif op == "ilike":
+            # Backslash escapes % and _, as in Postgres.
+            clauses.append(f"{_ident(column)} LIKE ? ESCAPE '\\'")
+            params.append(value)
+        elif op in SQL_OPERATORS:
+            clauses.append(f"{_ident(column)} {SQL_OPERATORS[op]} ?")
+            params.append(value)
+        else:
+            raise ValueError(f"Unsupported filter operator: {op!r}")
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def split_members(members):
+    """Member names from a projects.members value: comma-joined or a JSON list."""
+    if not members:
+        return []
+    if members.lstrip().startswith("["):
+        return [str(m).strip() for m in json.loads(members) if str(m).strip()]
+    return [m.strip() for m in members.split(",") if m.strip()]
+
+
+def _order_by(order):
+    if not order:
+        return ""
+    return " ORDER BY " + ", ".join(f"{_ident(c)} {'DESC' if desc else 'ASC'}" for c, desc in order)
+
+
+class SQLiteStore(Store):
+    """Local backend over a SQLite file (pm_app.db by default).
+
+    The database runs in WAL mode so readers never block the writer.
+    Connections are kept in a small pool and each one is used by a single
+    thread at a time, so Streamlit's per-rerun script threads reuse open
+    connections instead of reconnecting. ``path`` may be a ``file:`` URI.
+
+    A ``replica`` holds a copy of another database: it stores rows exactly as
+    given, without foreign key checks, cascades or change tracking.
+    """
+
+    def __init__(self, path, pool_size=8, replica=False):
+        self.path = path
+        self.replica = replica
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._keyed = {}
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            had_members = self._table_columns(conn, "project_members")
+            conn.executescript(SQLITE_SCHEMA)
+            if not had_members and not replica:
+                # Move the old comma-joined members column into project_members.
+                conn.executemany("INSERT OR IGNORE INTO project_members (project_id, member) VALUES (?, ?)",
+                                 [(pid, m) for pid, members in conn.execute("SELECT id, members FROM projects")
+                                  for m in split_members(members)])
+            for table in ("projects", "tasks"):
+                if "updated_at" not in self._table_columns(conn, table):
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN updated_at TEXT")
+                    conn.execute(f"UPDATE {table} SET updated_at = {SQLITE_NOW}")
+            if not replica:
+                conn.executescript(SQLITE_CASCADE)
+                conn.executescript(SQLITE_CHANGE_TRACKING)
+                had_search = self._table_columns(conn, "tasks_fts")
+                conn.executescript(SQLITE_SEARCH)
+                if not had_search:
+                    for table in SEARCH_FIELDS:
+                        conn.execute(f"INSERT INTO {table}_fts ({table}_fts) VALUES ('rebuild')")
+                had_rollup = self._table_columns(conn, "task_status_daily")
+                conn.executescript(SQLITE_ROLLUP)
+                if not had_rollup:
+                    conn.execute(SQLITE_ROLLUP_BACKFILL)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False,
+                               uri=self.path.startswith("file:"))
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self.replica:
+            conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @staticmethod
+    def _table_columns(conn, table):
+        return [r[1] for r in conn.execute(f"PRAGMA table_info({_ident(table)})")]
+
+    def columns(self, table):
+        with self._connection() as conn:
+            return self._table_columns(conn, table)
+
+    def _has_id(self, table):
+        if table not in self._keyed:
+            self._keyed[table] = "id" in self.columns(table)
+        return self._keyed[table]
+
+    @contextmanager
+    def _connection(self):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def _columns(self, columns):
+        if columns.strip() == "*":
+            return "*"
+        return ", ".join(_ident(c.strip()) for c in columns.split(","))
+
+    def select(self, table, columns="*", filters=(), order=(), offset=0, limit=None):
+        where, params = _where(filters)
+        sql = f"SELECT {self._columns(columns)} FROM {_ident(table)}{where}{_order_by(order)}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        with self._connection() as conn:
+            return [dict(r) for r in conn.execute(sql, params)]
+
+    def page(self, table, columns="*", filters=(), order=(), offset=0, limit=50):
+        return self.select(table, columns, filters, order, offset, limit), self.count(table, filters)
+
+    def count(self, table, filters=()):
+        where, params = _where(filters)
+        with self._connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {_ident(table)}{where}", params).fetchone()[0]
+
+    def status_counts(self, table):
+        with self._connection() as conn:
+            rows = conn.execute(f"SELECT status, COUNT(*) FROM {_ident(table)} GROUP BY status")
+            return {status: n for status, n in rows}
+
+    def search(self, text, offset=0, limit=20):
+        with self._connection() as conn:
+            for q in _fts_terms(text):
+                if not q:
+                    break
+                params = {"q": q, "n": offset + limit, "limit": limit, "offset": offset, "cap": SEARCH_MAX_TOTAL + 1}
+                total = conn.execute(SQLITE_SEARCH_COUNT, params).fetchone()[0]
+                if total:
+                    rows = conn.execute(f"SELECT * FROM ({SQLITE_SEARCH_QUERY}) "
+                                        "ORDER BY rank, title LIMIT :limit OFFSET :offset", params).fetchall()
+                    return [{c: r[c] for c in SEARCH_COLUMNS} for r in rows], min(total, SEARCH_MAX_TOTAL + 1)
+        return [], 0
+
+    def _insert(self, table, rows, on_conflict="", conn=None):
+        rows = [rows] if isinstance(rows, dict) else list(rows)
+        if not rows:
+            return
+        if self._has_id(table):
+            rows = [{"id": str(uuid.uuid4()), **r} if r.get("id") is None else r for r in rows]
+        columns = sorted({c for r in rows for c in r})
+        sql = (f"INSERT INTO {_ident(table)} ({', '.join(map(_ident, columns))}) "
+               f"VALUES ({', '.join('?' * len(columns))})")
+        if on_conflict:
+            sql += on_conflict.format(", ".join(f"{_ident(c)} = excluded.{_ident(c)}" for c in columns if c != "id"))
+        if conn is not None:
+            conn.executemany(sql, [[r.get(c) for c in columns] for r in rows])
+            return
+        with self._connection() as conn:
+            conn.executemany(sql, [[r.get(c) for c in columns] for r in rows])
+
+    def insert(self, table, rows):
+        self._insert(table, rows)
+
+    def add_project(self, project, members):
+        # Both inserts commit together or not at all.
+        with self._connection() as conn:
+            self._insert("projects", project, conn=conn)
+            self._insert("project_members", [{"project_id": project["id"], "member": m} for m in members], conn=conn)
+
+    def upsert(self, table, rows):
+        self._insert(table, rows, " ON CONFLICT (id) DO UPDATE SET {}")
+
+    def update(self, table, values, filters):
+        where, params = _where(filters)
+        assignments = ", ".join(f"{_ident(c)} = ?" for c in values)
+        with self._connection() as conn:
+            conn.execute(f"UPDATE {_ident(table)} SET {assignments}{where}", list(values.values()) + params)
+
+    def delete(self, table, filters):
+        where, params = _where(filters)
+        with self._connection() as conn:
+            conn.execute(f"DELETE FROM {_ident(table)}{where}", params)
+
+    def ping(self):
+        start = time.perf_counter()
+        with self._connection() as conn:
+            conn.execute("SELECT 1").fetchone()
+        return time.perf_counter() - start
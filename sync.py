@@ -0,0 +1,158 @@
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from storage import SQLiteStore, Store
+
+SYNCED_TABLES = ("projects", "tasks")
+
+
+def _rewind(stamp, seconds):
+    # Watermarks are re-read with some overlap so rows committed slightly out
+    # of timestamp order are not missed; re-applying a row is harmless.
+    moment = datetime.fromisoformat(stamp) - timedelta(seconds=seconds)
+    return moment.isoformat(timespec="milliseconds")
+
+
+def _sqlite_value(value):
+    return json.dumps(value) if isinstance(value, (list, dict)) else value
+
+
+class SyncedStore(Store):
+    """Serves reads from a local SQLite mirror of another store.
+
+    The first read copies ``projects`` and ``tasks`` in full. After that, a
+    refresh (at most every ``interval`` seconds, and right after each write
+    made through this store) pulls only rows whose ``updated_at`` moved past
+    the last watermark plus the tombstones recorded in ``deleted_rows`` since
+    then, so steady-state cost follows the number of changed rows rather than
+    the table size. The remote database needs the change tracking from
+    migrations/003_change_tracking.sql (the SQLite backend has it built in).
+
+    The mirror is a private file in a temporary directory, removed with the
+    store. It runs in WAL mode, so reads from other sessions go on while a
+    sync writes (a shared-cache in-memory database would fail them with
+    "database table is locked").
+    """
+
+    def __init__(self, remote, interval=5, overlap=5, batch_size=1000):
+        self.remote = remote
+        self.interval = interval
+        self.overlap = overlap
+        self.batch_size = batch_size
+        self._dir = tempfile.TemporaryDirectory(prefix="pm_mirror_")
+        self.local = SQLiteStore(os.path.join(self._dir.name, "mirror.db"), replica=True)
+        self._columns = {t: set(self.local.columns(t)) for t in SYNCED_TABLES}
+        self._marks = {}  # table -> (updated_at watermark, deleted_at watermark)
+        self._synced_at = None
+        self._lock = threading.Lock()
+
+    # --- sync ---
+    def sync(self, force=False):
+        with self._lock:
+            if not force and self._synced_at is not None and time.monotonic() - self._synced_at < self.interval:
+                return
+            for table in SYNCED_TABLES:
+                self._sync_table(table)
+            self._synced_at = time.monotonic()
+
+    def _pull(self, table, filters, order):
+        rows = []
+        for offset in itertools.count(0, self.batch_size):
+            batch = self.remote.select(table, "*", filters, order, offset, self.batch_size)
+            rows.extend(batch)
+            if len(batch) < self.batch_size:
+                return rows
+
+    def _sync_table(self, table):
+        tombstone_filters = (("eq", "table_name", table),)
+        if table not in self._marks:
+            # Full copy. Tombstones before this point are already reflected.
+            latest = self.remote.select("deleted_rows", "deleted_at", tombstone_filters,
+                                        (("deleted_at", True),), 0, 1)
+            deleted_mark = latest[0]["deleted_at"] if latest else None
+            rows, tombstones = self._pull(table, (), (("id", False),)), []
+            updated_mark = None
+        else:
+            updated_mark, deleted_mark = self._marks[table]
+            changed = (("gte", "updated_at", _rewind(updated_mark, self.overlap)),) if updated_mark else ()
+            rows = self._pull(table, changed, (("updated_at", False), ("id", False)))
+            if deleted_mark:
+                tombstone_filters += (("gte", "deleted_at", _rewind(deleted_mark, self.overlap)),)
+            tombstones = self._pull("deleted_rows", tombstone_filters, (("deleted_at", False), ("row_id", False)))
+
+        columns = self._columns[table]
+        self.local.upsert(table, [{c: _sqlite_value(v) for c, v in r.items() if c in columns} for r in rows])
+        # A row re-created after its tombstone keeps its newer version.
+        updated = {str(r["id"]): r.get("updated_at") or "" for r in rows}
+        gone = [t["row_id"] for t in tombstones if updated.get(t["row_id"], "") < t["deleted_at"]]
+        if gone:
+            self.local.delete(table, (("in_", "id", gone),))
+
+        stamps = [r["updated_at"] for r in rows if r.get("updated_at")]
+        deleted = [t["deleted_at"] for t in tombstones]
+        self._marks[table] = (max(stamps + [updated_mark or ""]) or None,
+                              max(deleted + [deleted_mark or ""]) or None)
+
+    def apply(self, event):
+        """Apply a realtime change event (see changefeed.py) to the mirror."""
+        table = event["table"]
+        if table not in SYNCED_TABLES:
+            return
+        with self._lock:
+            if event["type"] == "DELETE":
+                self.local.delete(table, (("eq", "id", event["old_record"]["id"]),))
+            else:
+                columns = self._columns[table]
+                self.local.upsert(table, {c: _sqlite_value(v) for c, v in event["record"].items() if c in columns})
+
+    def _reader(self, table):
+        if table in SYNCED_TABLES:
+            self.sync()
+            return self.local
+        return self.remote
+
+    # --- reads ---
+    def select(self, table, columns="*", filters=(), order=(), offset=0, limit=None):
+        return self._reader(table).select(table, columns, filters, order, offset, limit)
+
+    def page(self, table, columns="*", filters=(), order=(), offset=0, limit=50):
+        return self._reader(table).page(table, columns, filters, order, offset, limit)
+
+    def count(self, table, filters=()):
+        return self._reader(table).count(table, filters)
+
+    def status_counts(self, table):
+        return self._reader(table).status_counts(table)
+
+    def search(self, text, offset=0, limit=20):
+        # The mirror is a replica without search indexes.
+        return self.remote.search(text, offset, limit)
+
+    def ping(self):
+        return self.remote.ping()
+
+    # --- writes go to the remote store, then the mirror catches up ---
+    def insert(self, table, rows):
+        self.remote.insert(table, rows)
+        self.sync(force=True)
+
+    def add_project(self, project, members):
+        self.remote.add_project(project, members)
+        self.sync(force=True)
+
+    def upsert(self, table, rows):
+        self.remote.upsert(table, rows)
+        self.sync(force=True)
+
+    def update(self, table, values, filters):
+        self.remote.update(table, values, filters)
+        self.sync(force=True)
+
+    def delete(self, table, filters):
+        self.remote.delete(table, filters)
+        self.sync(force=True)
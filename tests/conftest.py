@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_store import ConcurrentReader, ThreadedAsyncStore  # noqa: E402
+from cache import TableCache  # noqa: E402
+from metrics import InstrumentedStore  # noqa: E402
+from storage import SQLiteStore  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteStore(str(tmp_path / "pm.db"))
+
+
+@pytest.fixture
+def seeded(store):
+    store.insert("projects", [
+        {"id": "P1", "name": "Website redesign", "description": "new homepage", "status": "In Progress"},
+        {"id": "P2", "name": "Mobile app", "description": "ios and android", "status": "Not Started"},
+    ])
+    store.insert("tasks", [
+        {"id": "T1", "project_id": "P1", "title": "Design homepage mockup", "assignee": "Alice",
+         "status": "In Progress", "due_date": "2024-01-10", "created_at": "2024-01-01T09:00:00"},
+        {"id": "T2", "project_id": "P1", "title": "Implement responsive layout", "assignee": "Bob",
+         "status": "To Do", "due_date": "2024-02-01", "created_at": "2024-01-02T09:00:00"},
+        {"id": "T3", "project_id": "P2", "title": "Beta test app", "assignee": "Alice",
+         "status": "Blocked", "due_date": "2024-03-01", "created_at": "2024-01-02T10:00:00"},
+    ])
+    return store
+
+
+@pytest.fixture
+def app(store, monkeypatch):
+    # PM_App in Streamlit's bare mode, on the test store and a fresh cache.
+    import PM_App
+
+    instrumented, cache = InstrumentedStore(store), TableCache()
+    reader = ConcurrentReader(ThreadedAsyncStore(instrumented))
+    monkeypatch.setattr(PM_App, "get_store", lambda: instrumented)
+    monkeypatch.setattr(PM_App, "get_cache", lambda: cache)
+    monkeypatch.setattr(PM_App, "get_reader", lambda: reader)
+    PM_App.reset_snapshot()
+    yield PM_App
+    reader.loop.call_soon_threadsafe(reader.loop.stop)
@@ -0,0 +1,171 @@
+import io
+from datetime import date
+
+import pandas as pd
+
+
+def test_prefetch_does_not_cache_reads_that_raced_a_write(app, monkeypatch):
+    app.get_store().insert("projects", {"id": "P1", "name": "Website", "status": "In Progress"})
+    reader = app.get_reader()
+
+    class WriteDuringReads:
+        def gather(self, calls):
+            results = reader.gather(calls)
+            app.get_store().update("projects", {"status": "Completed"}, (("eq", "id", "P1"),))
+            app.invalidate("projects")
+            return results
+
+    monkeypatch.setattr(app, "get_reader", lambda: WriteDuringReads())
+    app.prefetch(counts=("projects",))
+    assert app.get_cache().get(app.counts_key("projects")) is None
+    assert app.fetch_status_counts("projects").to_dict() == {"Completed": 1}
+
+
+def upload(name, data):
+    f = io.BytesIO(data)
+    f.name = name
+    return f
+
+
+def test_validate_task_rules(app):
+    assert app.validate_task("P1", "", "To Do", {"P1"}) == "Task title is required"
+    assert app.validate_task("P9", "Write", "To Do", {"P1"}) == "Unknown project 'P9'"
+    assert app.validate_task("P1", "Write", "Done", {"P1"}) == "Invalid status 'Done'"
+    assert app.validate_task("P1", "Write", "Blocked", {"P1"}) is None
+
+
+def test_import_tasks_reports_file_row_numbers(app):
+    app.get_store().insert("projects", {"id": "P1", "name": "Website"})
+    csv = (b"project_id,title,due_date,status\n"
+           b"P1,First,2024-01-10,\n"
+           b"\n"
+           b"P9,Unknown project,,\n"
+           b"P1,,,\n"
+           b"P1,Bad date,notadate,\n"
+           b",,,\n"
+           b"P1,Last,,Blocked\n")
+    inserted, errors = app.import_tasks(upload("tasks.csv", csv), batch_size=2)
+    assert inserted == 2
+    assert errors == [{"row": 4, "error": "Unknown project 'P9'"},
+                      {"row": 5, "error": "Task title is required"},
+                      {"row": 6, "error": "Invalid due date 'notadate'"}]
+    rows = app.get_store().select("tasks", "title,status,due_date", (), (("title", False),))
+    assert rows == [{"title": "First", "status": "To Do", "due_date": "2024-01-10"},
+                    {"title": "Last", "status": "Blocked", "due_date": None}]
+
+
+def test_import_tasks_skips_empty_excel_rows(app):
+    from openpyxl import Workbook
+
+    app.get_store().insert("projects", {"id": "P1", "name": "Website"})
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Project_ID", "Title", "Status"])
+    ws.append(["P1", "First", "Completed"])
+    ws.append([None, None, None])
+    ws.append(["P1", "Second", "Nope"])
+    ws.append([None, None, None])
+    data = io.BytesIO()
+    wb.save(data)
+    inserted, errors = app.import_tasks(upload("tasks.xlsx", data.getvalue()), batch_size=10)
+    assert inserted == 1
+    assert errors == [{"row": 4, "error": "Invalid status 'Nope'"}]
+
+
+def test_update_task_statuses_writes_only_the_status_and_patches_the_cache(app, seeded, monkeypatch):
+    open_tasks = (("neq", "status", "Completed"),)
+    assert sorted(app.fetch_tasks("id,title,status", open_tasks)["id"]) == ["T1", "T2", "T3"]
+    # Someone else renames T1 after this session loaded it.
+    seeded.update("tasks", {"title": "Renamed elsewhere"}, (("eq", "id", "T1"),))
+    updates = []
+    update = app.get_store().update
+    monkeypatch.setattr(app.get_store(), "update", lambda *args: updates.append(args) or update(*args))
+    app.update_task_statuses({"T1": "Completed", "T2": "Completed", "T3": "To Do"})
+    assert len(updates) == 2 and all(values.keys() == {"status"} for _, values, _ in updates)
+    assert seeded.select("tasks", "title,status", (("eq", "id", "T1"),)) == [
+        {"title": "Renamed elsewhere", "status": "Completed"}]
+    cached = app.get_cache().get(app.rows_key("tasks", "id,title,status", open_tasks))
+    assert cached.to_dict("records") == [{"id": "T3", "title": "Beta test app", "status": "To Do"}]
+
+
+def test_delete_project_deletes_tasks_first_without_a_cascade(app, seeded):
+    with seeded._connection() as conn:
+        conn.execute("DROP TRIGGER projects_cascade_delete")
+    app.delete_project("P1")
+    assert seeded.select("projects", "id") == [{"id": "P2"}]
+    assert seeded.select("tasks", "id") == [{"id": "T3"}]
+
+
+def test_prefetch_caches_every_query_for_the_page(app, seeded, monkeypatch):
+    app.prefetch(rows=(app.upcoming_query(),), counts=("projects", "tasks"), totals=(app.overdue_query(),))
+
+    def no_reads(calls):
+        raise AssertionError(f"queried again: {calls}")
+
+    monkeypatch.setattr(app.get_reader(), "gather", no_reads)
+    app.prefetch(rows=(app.upcoming_query(),), counts=("projects", "tasks"), totals=(app.overdue_query(),))
+    monkeypatch.setattr(seeded, "_connection", no_reads)
+    assert app.task_metrics().to_dict() == {"To Do": 1, "In Progress": 1, "Blocked": 1, "Completed": 0}
+    assert app.project_metrics().sum() == 2
+    assert app.overdue_count() == 3
+    assert app.upcoming_deadlines().empty
+
+
+def test_my_projects_pages_come_from_one_query_and_follow_writes(app, seeded):
+    app.st.session_state["user"] = "admin@example.com"
+    for i in range(3):
+        seeded.add_project({"id": f"P{i + 3}", "name": f"Audit {i}", "status": "Not Started"}, ["Dana"])
+    mine = (("eq", "member", "Dana"),)
+    df, total = app.fetch_page("member_projects", "id,name,status,end_date", "name", page=1, page_size=2,
+                               filters=mine)
+    assert list(df["id"]) == ["P5"] and total == 3
+    assert pd.api.types.is_datetime64_any_dtype(df["end_date"])
+    app.add_project("P9", "Zebra", "", date(2024, 1, 1), date(2024, 2, 1), ["Dana"])
+    assert app.fetch_page("member_projects", "id,name,status,end_date", "name", page=1, page_size=2,
+                          filters=mine)[1] == 4
+
+
+def test_my_tasks_counts_and_rows_come_from_the_database(app, store):
+    store.insert("projects", {"id": "P1", "name": "Website"})
+    store.insert("tasks", [{"id": f"T{i:04d}", "project_id": "P1", "title": "Task", "assignee": "Alice",
+                            "status": "Completed" if i % 3 else "Blocked"} for i in range(1200)])
+    store.insert("tasks", {"id": "B1", "project_id": "P1", "title": "Task", "assignee": "Bob", "status": "To Do"})
+    counts = app.member_task_counts("Alice")
+    assert counts.to_dict() == {"To Do": 0, "In Progress": 0, "Blocked": 400, "Completed": 800}
+    df, total = app.fetch_page("tasks", "id,status", "id", page=0, page_size=50, statuses=["Blocked"],
+                               filters=(("eq", "assignee", "Alice"),))
+    assert total == 400 and len(df) == 50 and set(df["status"]) == {"Blocked"}
+
+
+def test_find_rows_matches_the_id_and_literal_name_prefixes(app, store):
+    store.insert("projects", [{"id": "P1", "name": "beta"}, {"id": "P2", "name": "Beta_2"},
+                              {"id": "P3", "name": "Betax2"}, {"id": "beta", "name": "Alpha"}])
+    assert app.find_rows("projects", "name", "beta") == {"beta": "Alpha", "P1": "beta", "P2": "Beta_2",
+                                                         "P3": "Betax2"}
+    assert app.find_rows("projects", "name", "beta_") == {"P2": "Beta_2"}
+    first = app.find_rows("projects", "name", "be", limit=2)
+    assert len(first) == 2 and list(first.values()) == sorted(first.values(), key=str.lower)
+
+
+def test_status_trend_counts_from_the_first_day_and_returns_the_window(app, monkeypatch):
+    today = pd.Timestamp.now("UTC").tz_localize(None).normalize()
+    rows = pd.DataFrame([
+        {"day": today - pd.Timedelta(days=10), "status": "To Do", "delta": 3, "entered": 3},
+        {"day": today - pd.Timedelta(days=1), "status": "To Do", "delta": -1, "entered": 0},
+        {"day": today - pd.Timedelta(days=1), "status": "Completed", "delta": 1, "entered": 1},
+    ])
+    monkeypatch.setattr(app, "fetch_trend", lambda filters=(): rows)
+    counts, entered = app.status_trend(days=5)
+    assert list(counts.index) == list(pd.date_range(today - pd.Timedelta(days=4), today))
+    assert list(counts.columns) == app.TASK_STATUSES
+    assert list(counts["To Do"]) == [3, 3, 3, 2, 2]
+    assert list(counts["Completed"]) == [0, 0, 0, 1, 1]
+    assert entered.sum().to_dict() == {"To Do": 0, "In Progress": 0, "Blocked": 0, "Completed": 1}
+
+
+def test_fetch_trend_reads_the_rollup_in_batches(app, seeded, monkeypatch):
+    monkeypatch.setattr(app, "TREND_BATCH", 2)
+    rows = app.fetch_trend()
+    assert pd.api.types.is_datetime64_any_dtype(rows["day"])
+    assert rows.groupby("status")["delta"].sum().to_dict() == {"Blocked": 1, "In Progress": 1, "To Do": 1}
+    assert app.fetch_trend((("eq", "assignee", "Alice"),))["delta"].sum() == 2
@@ -0,0 +1,40 @@
+import asyncio
+
+import supabase
+
+from async_store import AsyncSupabaseStore, ConcurrentReader, ThreadedAsyncStore
+
+
+def test_concurrent_first_queries_create_one_client(monkeypatch):
+    created = []
+
+    class Client:
+        def table(self, name):
+            return name
+
+    async def acreate_client(url, key, options=None):
+        await asyncio.sleep(0.01)
+        created.append(url)
+        return Client()
+
+    monkeypatch.setattr(supabase, "acreate_client", acreate_client)
+    store = AsyncSupabaseStore("http://localhost:54321", "key")
+
+    async def run():
+        return await asyncio.gather(*(store._table(t) for t in ("projects", "tasks", "projects", "tasks")))
+
+    assert asyncio.run(run()) == ["projects", "tasks", "projects", "tasks"]
+    assert len(created) == 1
+
+
+def test_concurrent_reader_returns_results_and_errors_in_order(seeded):
+    reader = ConcurrentReader(ThreadedAsyncStore(seeded))
+    try:
+        count, counts, error = reader.gather([("count", ("tasks", (("eq", "assignee", "Alice"),))),
+                                              ("status_counts", ("projects",)),
+                                              ("select", ("missing_table",))])
+    finally:
+        reader.loop.call_soon_threadsafe(reader.loop.stop)
+    assert count == 2
+    assert counts == {"In Progress": 1, "Not Started": 1}
+    assert isinstance(error, Exception)
@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+
+import cache as cache_module
+from cache import TableCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TableCache(ttl=10)
+    cache.put(("tasks", "rows"), "value")
+    clock[0] += 9
+    assert cache.get(("tasks", "rows")) == "value"
+    clock[0] += 2
+    assert cache.get(("tasks", "rows")) is None
+    assert cache.keys("tasks") == []
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    value = b"x" * 100
+    size = cache_module.estimate_size(value)
+    cache = TableCache(max_bytes=2 * size)
+    cache.put(("tasks", 1), value)
+    cache.put(("tasks", 2), value)
+    cache.get(("tasks", 1))
+    cache.put(("tasks", 3), value)
+    assert cache.keys("tasks") == [("tasks", 1), ("tasks", 3)]
+
+
+def test_values_larger_than_the_cache_are_returned_but_not_kept():
+    cache = TableCache(max_bytes=10)
+    assert cache.get_or_load(("tasks", 1), lambda: b"x" * 100) == b"x" * 100
+    assert cache.get(("tasks", 1)) is None
+
+
+def test_invalidate_drops_only_the_given_tables():
+    cache = TableCache()
+    cache.put(("tasks", "rows"), 1)
+    cache.put(("tasks", "status_counts"), 2)
+    cache.put(("projects", "rows"), 3)
+    cache.invalidate("tasks")
+    assert cache.keys("tasks") == []
+    assert cache.get(("projects", "rows")) == 3
+
+
+def test_get_or_load_calls_the_loader_once():
+    cache = TableCache()
+    calls = []
+    for _ in range(3):
+        cache.get_or_load(("tasks", "rows"), lambda: calls.append(1) or len(calls))
+    assert calls == [1]
+
+
+def test_patch_keeps_expiry_and_none_drops(clock):
+    cache = TableCache(ttl=10)
+    cache.put(("tasks", "rows"), 1)
+    clock[0] += 5
+    cache.patch(("tasks", "rows"), lambda v: v + 1)
+    assert cache.get(("tasks", "rows")) == 2
+    clock[0] += 6
+    assert cache.get(("tasks", "rows")) is None
+    cache.put(("tasks", "rows"), 1)
+    cache.patch(("tasks", "rows"), lambda v: None)
+    assert cache.get(("tasks", "rows")) is None
+    cache.patch(("tasks", "missing"), lambda v: pytest.fail("patched a missing entry"))
+
+
+def test_patch_runs_outside_the_lock_and_drops_entries_replaced_meanwhile():
+    cache = TableCache()
+    cache.put(("tasks", "rows"), 1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow(value):
+        started.set()
+        release.wait(5)
+        return value + 1
+
+    worker = threading.Thread(target=cache.patch, args=(("tasks", "rows"), slow))
+    worker.start()
+    started.wait(5)
+    # Readers and writers are not blocked while the patch is computed.
+    assert cache.get(("tasks", "rows")) == 1
+    cache.put(("tasks", "rows"), 10)
+    release.set()
+    worker.join(5)
+    assert cache.get(("tasks", "rows")) is None
+
+
+def test_a_load_that_raced_an_invalidate_is_not_cached():
+    cache = TableCache()
+    started, release = threading.Event(), threading.Event()
+
+    def load():
+        started.set()
+        release.wait(5)
+        return "old"
+
+    worker = threading.Thread(target=cache.get_or_load, args=(("tasks", "rows"), load))
+    worker.start()
+    started.wait(5)
+    # Another session writes while the rows are being read.
+    cache.invalidate("tasks")
+    release.set()
+    worker.join(5)
+    assert cache.get(("tasks", "rows")) is None
+    assert cache.get_or_load(("tasks", "rows"), lambda: "new") == "new"
+    assert cache.get(("tasks", "rows")) == "new"
+
+
+def test_put_with_a_stale_generation_is_skipped():
+    cache = TableCache()
+    generation = cache.generation("tasks")
+    cache.changed("tasks")
+    assert cache.put(("tasks", "rows"), 1, generation) == 1
+    assert cache.get(("tasks", "rows")) is None
+    cache.put(("projects", "rows"), 2, cache.generation("projects"))
+    assert cache.get(("projects", "rows")) == 2
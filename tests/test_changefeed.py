@@ -0,0 +1,105 @@
+import threading
+
+import pandas as pd
+
+from cache import TableCache
+from changefeed import EventBatcher, EventBus, patch_cache
+from schema import normalize
+
+OPEN = (("neq", "status", "Completed"),)
+
+
+def task(id, status="To Do", title="Task", assignee="Alice"):
+    return {"id": id, "project_id": "P1", "title": title, "assignee": assignee, "status": status,
+            "due_date": "2024-01-10"}
+
+
+def cached(rows, columns="*", filters=OPEN):
+    cache = TableCache()
+    key = ("tasks", "rows", columns, filters)
+    cache.put(key, normalize("tasks", pd.DataFrame(rows)))
+    return cache, key
+
+
+def event(type, record=None, old_id=None):
+    e = {"table": "tasks", "type": type}
+    if record is not None:
+        e["record"] = record
+    if old_id is not None:
+        e["old_record"] = {"id": old_id}
+    return e
+
+
+def test_update_moves_rows_in_and_out_of_filtered_queries():
+    cache, key = cached([task("T1"), task("T2")])
+    patch_cache(cache, event("UPDATE", task("T1", status="Completed")))
+    patch_cache(cache, event("UPDATE", task("T2", title="Renamed")))
+    patch_cache(cache, event("INSERT", task("T3", status="Blocked")))
+    df = cache.get(key)
+    assert sorted(df["id"]) == ["T2", "T3"]
+    assert df.set_index("id").loc["T2", "title"] == "Renamed"
+    # Patched frames stay normalized.
+    assert isinstance(df["status"].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(df["due_date"])
+
+
+def test_delete_removes_the_row_and_only_selected_columns_are_kept():
+    cache, key = cached([{"id": "T1", "title": "a"}, {"id": "T2", "title": "b"}], columns="id,title", filters=())
+    patch_cache(cache, event("DELETE", old_id="T1"))
+    patch_cache(cache, event("INSERT", task("T3")))
+    assert cache.get(key).to_dict("records") == [{"id": "T2", "title": "b"}, {"id": "T3", "title": "Task"}]
+
+
+def test_a_batch_applies_the_last_event_per_row():
+    cache, key = cached([task("T1"), task("T2")])
+    patch_cache(cache, [
+        event("UPDATE", task("T1", status="Completed")),
+        event("UPDATE", task("T1", status="Blocked")),
+        event("DELETE", old_id="T2"),
+        event("INSERT", task("T2", title="Back")),
+        {"table": "projects", "type": "DELETE", "old_record": {"id": "P9"}},
+    ])
+    df = cache.get(key).set_index("id")
+    assert df.loc["T1", "status"] == "Blocked"
+    assert df.loc["T2", "title"] == "Back"
+
+
+def test_other_entries_of_the_table_are_dropped():
+    cache, key = cached([task("T1")])
+    cache.put(("tasks", "status_counts"), {"To Do": 1})
+    cache.put(("projects", "status_counts"), {"Not Started": 1})
+    patch_cache(cache, event("UPDATE", task("T1", status="Blocked")))
+    assert cache.keys("tasks") == [key]
+    assert cache.get(("projects", "status_counts")) == {"Not Started": 1}
+
+
+def test_filters_are_matched_like_the_database():
+    filters = (("eq", "assignee", "Alice"), ("in_", "status", ("To Do", "Blocked")), ("ilike", "title", "fix%"))
+    cache, key = cached([], filters=filters)
+    patch_cache(cache, [
+        event("INSERT", task("T1", title="Fix login")),
+        event("INSERT", task("T2", title="Fix logout", assignee="Bob")),
+        event("INSERT", task("T3", title="Write docs")),
+        event("INSERT", task("T4", title="FIX build", status="Completed")),
+    ])
+    assert list(cache.get(key)["id"]) == ["T1"]
+
+
+def test_event_batcher_delivers_a_burst_as_one_list():
+    batches, done = [], threading.Event()
+    bus = EventBus()
+    bus.subscribe(EventBatcher(lambda events: (batches.append(events), done.set()), delay=0.05))
+    for i in range(100):
+        bus.publish(event("DELETE", old_id=f"T{i}"))
+    assert done.wait(5)
+    assert [len(b) for b in batches] == [100]
+
+
+def test_unsubscribed_callbacks_get_no_events():
+    received = []
+    bus = EventBus()
+    unsubscribe = bus.subscribe(received.append)
+    bus.publish(event("DELETE", old_id="T1"))
+    unsubscribe()
+    bus.publish(event("DELETE", old_id="T2"))
+    assert len(received) == 1
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+import metrics
+from cache import estimate_size
+from metrics import InstrumentedStore, Recorder, instrument
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    recorder = Recorder()
+    monkeypatch.setattr(metrics, "RECORDER", recorder)
+    return recorder
+
+
+def test_instrument_records_rows_size_round_trips_and_cache_hits(recorder, seeded):
+    store = InstrumentedStore(seeded)
+    cached = {}
+
+    @instrument(cached=True)
+    def fetch():
+        if "tasks" not in cached:
+            cached["tasks"] = pd.DataFrame(store.select("tasks"))
+        return cached["tasks"]
+
+    @instrument("page")
+    def page():
+        return fetch(), store.count("tasks")
+
+    df, _ = page()
+    fetch()
+    miss, outer, hit = list(recorder.recent)
+    assert (miss["name"], miss["cache"], miss["db_calls"], miss["rows"]) == ("fetch", "miss", 1, 3)
+    assert miss["memory_bytes"] == estimate_size(df)
+    assert (hit["cache"], hit["db_calls"]) == ("hit", 0)
+    # Round trips of nested calls count for the enclosing call too.
+    assert (outer["name"], outer["db_calls"], outer["rows"]) == ("page", 2, 3)
+    summary = recorder.summary().set_index("function")
+    assert summary.loc["fetch", "calls"] == 2 and summary.loc["fetch", "hit_rate"] == 0.5
+
+
+def test_errors_are_recorded_and_raised(recorder):
+    @instrument()
+    def broken():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        broken()
+    assert recorder.last("broken")["error"] == "ValueError: boom"
+    assert recorder.summary().loc[0, "errors"] == 1
+
+
+def test_prometheus_export(recorder, tmp_path):
+    @instrument()
+    def helper():
+        return [1, 2]
+
+    helper()
+    path = tmp_path / "metrics.prom"
+    recorder.write_prometheus(str(path))
+    text = path.read_text()
+    assert '# TYPE pm_app_call_duration_seconds histogram' in text
+    assert 'pm_app_call_duration_seconds_bucket{function="helper",le="+Inf"} 1' in text
+    assert 'pm_app_rows_total{function="helper"} 2' in text
+    assert 'pm_app_memory_bytes_total{function="helper"}' in text
+    assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,229 @@
+import sqlite3
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+from postgrest.exceptions import APIError
+
+from storage import SEARCH_MAX_TOTAL, SQLiteStore, SupabaseStore
+
+
+def test_select_filters_order_and_limit(seeded):
+    rows = seeded.select("tasks", "id,status", (("neq", "status", "Blocked"),), (("id", True),), 0, 1)
+    assert rows == [{"id": "T2", "status": "To Do"}]
+    assert seeded.select("tasks", "id", (("in_", "id", []),)) == []
+    assert seeded.count("tasks", (("eq", "assignee", "Alice"),)) == 2
+    assert seeded.page("tasks", "id", (), (("id", False),), 1, 1) == ([{"id": "T2"}], 3)
+    assert seeded.status_counts("tasks") == {"In Progress": 1, "To Do": 1, "Blocked": 1}
+
+
+def test_ilike_is_case_insensitive(seeded):
+    assert [r["id"] for r in seeded.select("tasks", "id", (("ilike", "title", "design%"),))] == ["T1"]
+    assert [r["id"] for r in seeded.select("tasks", "id", (("ilike", "title", "%APP"),))] == ["T3"]
+
+
+def test_rejects_unknown_identifiers_and_operators(seeded):
+    with pytest.raises(ValueError):
+        seeded.select("tasks; drop table tasks", "id")
+    with pytest.raises(ValueError):
+        seeded.select("tasks", "id", (("like", "title", "x"),))
+
+
+def test_upsert_replaces_rows_by_id(seeded):
+    seeded.upsert("tasks", [{"id": "T1", "project_id": "P1", "title": "Renamed"},
+                            {"id": "T8", "project_id": "P2", "title": "New"}])
+    assert seeded.select("tasks", "title", (("in_", "id", ["T1", "T8"]),), (("id", False),)) == [
+        {"title": "Renamed"}, {"title": "New"}]
+
+
+def test_inserted_rows_without_an_id_get_one(store):
+    store.insert("projects", {"name": "No id"})
+    assert store.select("projects", "id")[0]["id"]
+
+
+def test_writes_stamp_updated_at_and_deletes_leave_tombstones(seeded):
+    assert seeded.select("tasks", "updated_at", (("eq", "id", "T1"),))[0]["updated_at"]
+    seeded.update("tasks", {"status": "Completed", "updated_at": None}, (("eq", "id", "T1"),))
+    seeded.update("tasks", {"status": "To Do"}, (("eq", "id", "T1"),))
+    assert seeded.select("tasks", "updated_at", (("eq", "id", "T1"),))[0]["updated_at"]
+    seeded.delete("tasks", (("eq", "id", "T2"),))
+    assert [(r["table_name"], r["row_id"]) for r in seeded.select("deleted_rows")] == [("tasks", "T2")]
+
+
+def test_opening_an_old_file_stamps_existing_rows(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE projects (id TEXT PRIMARY KEY, name TEXT, description TEXT, start_date TEXT,
+            end_date TEXT, status TEXT, members TEXT, created_by TEXT, created_at TEXT);
+        CREATE TABLE tasks (id TEXT PRIMARY KEY, project_id TEXT, title TEXT, due_date TEXT,
+            assignee TEXT, status TEXT, created_at TEXT);
+        INSERT INTO projects (id, name) VALUES ('P1', 'Old');
+        INSERT INTO tasks (id, project_id, title, status) VALUES ('T1', 'P1', 'One', 'To Do');
+    """)
+    conn.commit()
+    conn.close()
+    store = SQLiteStore(path)
+    assert all(r["updated_at"] for table in ("projects", "tasks") for r in store.select(table, "updated_at"))
+
+
+def test_deleting_a_project_deletes_its_tasks(seeded):
+    seeded.delete("projects", (("eq", "id", "P1"),))
+    assert [r["id"] for r in seeded.select("tasks", "id")] == ["T3"]
+
+
+def test_add_project_is_atomic(seeded):
+    with pytest.raises(sqlite3.IntegrityError):
+        seeded.add_project({"id": "P3", "name": "Audit"}, ["Alice", None])
+    assert seeded.select("projects", "id", (("eq", "id", "P3"),)) == []
+    seeded.add_project({"id": "P3", "name": "Audit"}, ["Alice"])
+    assert seeded.select("project_members", "member", (("eq", "project_id", "P3"),)) == [{"member": "Alice"}]
+
+
+def test_member_projects_joins_memberships_and_follows_deletes(seeded):
+    seeded.add_project({"id": "P3", "name": "Audit"}, ["Alice", "Bob"])
+    seeded.add_project({"id": "P4", "name": "Budget"}, ["Bob"])
+    rows, total = seeded.page("member_projects", "id,name", (("eq", "member", "Bob"),), (("name", False),))
+    assert rows == [{"id": "P3", "name": "Audit"}, {"id": "P4", "name": "Budget"}] and total == 2
+    seeded.delete("projects", (("eq", "id", "P3"),))
+    assert seeded.select("project_members", "*", (("eq", "project_id", "P3"),)) == []
+    assert seeded.count("member_projects", (("eq", "member", "Alice"),)) == 0
+
+
+def test_opening_an_old_file_moves_members_into_project_members(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE projects (id TEXT PRIMARY KEY, name TEXT, description TEXT, start_date TEXT,
+            end_date TEXT, status TEXT, members TEXT, created_by TEXT, created_at TEXT);
+        INSERT INTO projects (id, name, members) VALUES ('P1', 'Old', 'Alice, Bob'), ('P2', 'Older', '["Dana"]');
+    """)
+    conn.commit()
+    conn.close()
+    members = SQLiteStore(path).select("project_members", "*", (), (("project_id", False), ("member", False)))
+    assert [(r["project_id"], r["member"]) for r in members] == [("P1", "Alice"), ("P1", "Bob"), ("P2", "Dana")]
+
+
+def test_search_ranks_matches_and_tolerates_typos(seeded):
+    rows, total = seeded.search("homepage")
+    assert total == 2 and {r["id"] for r in rows} == {"P1", "T1"}
+    assert seeded.search("homepge")[0][0]["id"] in {"P1", "T1"}
+    assert seeded.search("design mockup")[0] == [
+        {"kind": "task", "id": "T1", "title": "Design homepage mockup", "status": "In Progress"}]
+    assert seeded.search("zzzz") == ([], 0)
+    # Fuzzy matches need a 4-character run of every term, not any trigram.
+    assert seeded.search("desxxx")[1] == 0
+
+
+def test_search_pages_and_caps_the_total(store):
+    store.insert("projects", {"id": "P1", "name": "Bulk"})
+    store.insert("tasks", [{"id": f"T{i:05d}", "project_id": "P1", "title": f"audit item {i}"}
+                           for i in range(SEARCH_MAX_TOTAL + 50)])
+    rows, total = store.search("audit", offset=20, limit=10)
+    assert len(rows) == 10 and total == SEARCH_MAX_TOTAL + 1
+    assert store.search("item 7")[1] > 0
+
+
+class FakeQuery:
+    # Just enough of the Supabase query builder for SupabaseStore.search.
+    def __init__(self, client, table=None, error=None):
+        self.client, self.table, self.error, self.calls = client, table, error, []
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return call
+
+    def execute(self):
+        if self.error is not None:
+            raise self.error
+        self.client.queries.append((self.table, self.calls))
+        rows = [{"id": f"{self.table}-{i}", "title": "match", "status": "To Do"} for i in range(3)]
+        start, end = next(args for name, args, _ in self.calls if name == "range")
+        return SimpleNamespace(data=rows[start:end + 1], count=len(rows))
+
+
+class FakeClient:
+    def __init__(self, rpc_error):
+        self.rpc_error, self.queries = rpc_error, []
+
+    def rpc(self, name, params):
+        return FakeQuery(self, error=self.rpc_error)
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+def test_supabase_search_falls_back_only_when_the_function_is_missing():
+    client = FakeClient(APIError({"code": "PGRST202", "message": "Could not find the function"}))
+    rows, total = SupabaseStore(client).search("match", offset=2, limit=2)
+    assert [r["id"] for r in rows] == ["projects-2", "tasks-0"] and total == 6
+    # Each table is read up to the end of the page only.
+    assert all(("range", (0, 3), {}) in calls for _, calls in client.queries)
+    for error in (APIError({"code": "57014", "message": "canceling statement due to statement timeout"}),
+                  TimeoutError("timed out")):
+        with pytest.raises(type(error)):
+            SupabaseStore(FakeClient(error)).search("match")
+
+
+def test_opening_an_old_file_indexes_existing_rows_for_search(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE projects (id TEXT PRIMARY KEY, name TEXT, description TEXT, start_date TEXT,
+            end_date TEXT, status TEXT, members TEXT, created_by TEXT, created_at TEXT);
+        CREATE TABLE tasks (id TEXT PRIMARY KEY, project_id TEXT, title TEXT, due_date TEXT,
+            assignee TEXT, status TEXT, created_at TEXT);
+        INSERT INTO projects (id, name) VALUES ('P1', 'Onboarding');
+        INSERT INTO tasks (id, project_id, title) VALUES ('T1', 'P1', 'Write onboarding guide');
+    """)
+    conn.commit()
+    conn.close()
+    assert SQLiteStore(path).search("onboarding")[1] == 2
+
+
+def test_ilike_escapes_wildcards(seeded):
+    seeded.insert("tasks", [{"id": "T4", "project_id": "P1", "title": "50% done"},
+                            {"id": "T5", "project_id": "P1", "title": "500 done"}])
+    assert [r["id"] for r in seeded.select("tasks", "id", (("ilike", "title", "50\\%%"),))] == ["T4"]
+
+
+def rollup_counts(store, **filters):
+    counts = Counter()
+    for r in store.select("task_status_daily", "*", tuple(("eq", c, v) for c, v in filters.items())):
+        counts[r["status"]] += r["delta"]
+    return {status: n for status, n in counts.items() if n}
+
+
+def test_rollup_follows_task_writes(seeded):
+    assert rollup_counts(seeded) == seeded.status_counts("tasks")
+    seeded.update("tasks", {"status": "Completed"}, (("in_", "id", ["T1", "T2"]),))
+    seeded.update("tasks", {"title": "Renamed"}, (("eq", "id", "T3"),))
+    seeded.upsert("tasks", [{"id": "T3", "project_id": "P1", "title": "Moved", "status": "Blocked"}])
+    seeded.insert("tasks", {"id": "T4", "project_id": "P2", "title": "Ship", "status": "To Do"})
+    seeded.delete("projects", (("eq", "id", "P2"),))
+    assert rollup_counts(seeded) == seeded.status_counts("tasks") == {"Completed": 2, "Blocked": 1}
+    assert rollup_counts(seeded, project_id="P1") == {"Completed": 2, "Blocked": 1}
+    assert rollup_counts(seeded, assignee="Alice") == {"Completed": 1, "Blocked": 1}
+    entered = {r["status"]: r["entered"] for r in seeded.select("task_status_by_day") if r["entered"]}
+    # New tasks and status changes count; the rename and the project move do not.
+    assert entered == {"In Progress": 1, "To Do": 2, "Blocked": 1, "Completed": 2}
+
+
+def test_opening_an_old_file_backfills_the_rollup(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE projects (id TEXT PRIMARY KEY, name TEXT, description TEXT, start_date TEXT,
+            end_date TEXT, status TEXT, members TEXT, created_by TEXT, created_at TEXT);
+        CREATE TABLE tasks (id TEXT PRIMARY KEY, project_id TEXT, title TEXT, due_date TEXT,
+            assignee TEXT, status TEXT, created_at TEXT);
+        INSERT INTO projects (id, name) VALUES ('P1', 'Old');
+        INSERT INTO tasks (id, project_id, title, status, created_at)
+            VALUES ('T1', 'P1', 'One', 'To Do', '2024-05-01T10:00:00'), ('T2', 'P1', 'Two', 'To Do', NULL);
+    """)
+    conn.commit()
+    conn.close()
+    days = {r["day"]: r["delta"] for r in SQLiteStore(path).select("task_status_by_day")}
+    assert days["2024-05-01"] == 1 and sum(days.values()) == 2
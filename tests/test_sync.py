@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+from storage import SQLiteStore
+from sync import SyncedStore
+
+
+@pytest.fixture
+def remote(tmp_path):
+    store = SQLiteStore(str(tmp_path / "remote.db"))
+    store.insert("projects", [{"id": "P1", "name": "Website"}, {"id": "P2", "name": "Mobile"}])
+    store.insert("tasks", [{"id": f"T{i}", "project_id": "P1", "title": f"Task {i}", "status": "To Do"}
+                           for i in range(5)])
+    return store
+
+
+@pytest.fixture
+def synced(remote):
+    return SyncedStore(remote, interval=0)
+
+
+def ids(store, table="tasks", filters=()):
+    return sorted(r["id"] for r in store.select(table, "id", filters))
+
+
+def test_first_read_copies_the_remote_tables(remote, synced):
+    assert ids(synced) == ids(remote)
+    assert ids(synced, "projects") == ["P1", "P2"]
+    assert synced.status_counts("tasks") == {"To Do": 5}
+    assert synced.count("tasks", (("eq", "status", "To Do"),)) == 5
+
+
+def test_later_syncs_pull_changes_and_deletes(remote, synced):
+    synced.sync()
+    remote.update("tasks", {"status": "Completed"}, (("eq", "id", "T1"),))
+    remote.delete("tasks", (("eq", "id", "T2"),))
+    remote.insert("tasks", {"id": "T9", "project_id": "P2", "title": "New"})
+    synced.sync(force=True)
+    assert ids(synced) == ["T0", "T1", "T3", "T4", "T9"]
+    assert synced.select("tasks", "status", (("eq", "id", "T1"),)) == [{"status": "Completed"}]
+
+
+def test_a_row_recreated_after_its_delete_is_kept(remote, synced):
+    synced.sync()
+    remote.delete("tasks", (("eq", "id", "T1"),))
+    remote.insert("tasks", {"id": "T1", "project_id": "P1", "title": "Again"})
+    synced.sync(force=True)
+    assert synced.select("tasks", "title", (("eq", "id", "T1"),)) == [{"title": "Again"}]
+
+
+def test_writes_go_to_the_remote_and_are_read_back_at_once(remote, synced):
+    synced.sync()
+    synced.update("tasks", {"status": "Blocked"}, (("in_", "id", ["T0", "T3"]),))
+    synced.add_project({"id": "P3", "name": "Audit"}, ["Alice"])
+    synced.delete("projects", (("eq", "id", "P1"),))
+    assert ids(remote) == ids(synced) == []
+    assert ids(synced, "projects") == ["P2", "P3"]
+    assert remote.select("project_members", "member") == [{"member": "Alice"}]
+
+
+def test_realtime_events_are_applied_to_the_mirror(synced):
+    synced.sync()
+    synced.interval = 3600
+    synced.apply({"table": "tasks", "type": "UPDATE",
+                  "record": {"id": "T0", "project_id": "P1", "title": "Live", "status": "Blocked", "extra": 1}})
+    synced.apply({"table": "tasks", "type": "DELETE", "old_record": {"id": "T1"}})
+    synced.apply({"table": "deleted_rows", "type": "INSERT", "record": {"row_id": "x"}})
+    assert synced.select("tasks", "title,status", (("eq", "id", "T0"),)) == [{"title": "Live", "status": "Blocked"}]
+    assert "T1" not in ids(synced)
+
+
+def test_search_and_other_tables_are_read_from_the_remote(remote, synced):
+    remote.add_project({"id": "P3", "name": "Audit"}, ["Dana"])
+    assert synced.search("audit")[1] == 1
+    assert synced.select("project_members", "member") == [{"member": "Dana"}]
+
+
+def test_a_sync_does_not_fail_a_read_in_progress(remote, synced):
+    synced.sync()
+    remote.update("tasks", {"status": "Completed"}, ())
+    with synced.local._connection() as conn:
+        cursor = conn.execute("SELECT id FROM tasks")
+        cursor.fetchone()
+        synced.sync(force=True)
+        assert len(cursor.fetchall()) == 4
+    assert synced.status_counts("tasks") == {"Completed": 5}
+
+
+def test_reads_run_while_other_sessions_sync(remote, synced):
+    remote.insert("tasks", [{"id": f"B{i}", "project_id": "P1", "title": "Bulk", "status": "To Do"}
+                            for i in range(2000)])
+    synced.sync()
+    errors, stop = [], time.monotonic() + 1.5
+    bulk = [f"B{i}" for i in range(500)]
+
+    def read():
+        while time.monotonic() < stop:
+            try:
+                synced.select("tasks", "id,status", (("eq", "status", "Done"),))
+                synced.count("tasks")
+            except Exception as e:
+                errors.append(e)
+
+    def write():
+        flip = False
+        while time.monotonic() < stop:
+            flip = not flip
+            try:
+                synced.update("tasks", {"status": "Done" if flip else "To Do"}, (("in_", "id", bulk),))
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(4)] + [threading.Thread(target=write)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []